@@ -6,24 +6,40 @@ FIXED VERSION - Resolves 'dict' object has no attribute 'name' error
 """
 
 import streamlit as st
+# pandas stays a top-level import: the module-scope cached helpers
+# (_parse_upload, _default_haircuts, the template CSV) need it before
+# any page runs, so demoting it to per-page imports would only move the
+# cost, not remove it. Truly page-local heavyweights were already
+# dropped from the top of this file.
 import pandas as pd
 import numpy as np
 import logging
+import traceback
 from datetime import datetime, timedelta
 import json
-import hashlib
+import os
+import time
+from array import array
+from importlib.util import find_spec
+from itertools import chain
+from multiprocessing import get_context
 from pathlib import Path
 import io
 
+# orjson serializes the results payload (numpy arrays included) several
+# times faster than stdlib json; optional, same guard as in src.logger
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import custom modules
-from src.balance_sheet import BalanceSheet
+import config
+from src.balance_sheet import BalanceSheet, BalanceSheetInput
 from src.stress_scenarios import StressScenario
-from src.liquidity_engine import LiquidityEngine
-from src.metrics_calculator import MetricsCalculator
-from src.survival_analyzer import SurvivalAnalyzer
-from src.visualization import Visualizer
+from src.liquidity_engine import LiquidityEngine, run_scenario_job
 from src.security import SecurityManager
-from src.logger import AppLogger
+from src.logger import AppLogger, AuditLogger
 
 # Configure page
 st.set_page_config(
@@ -33,14 +49,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize logger
+# Initialize logger (AppLogger memoizes instances per name)
 logger = AppLogger.get_logger(__name__)
 
-# Initialize security manager
-security = SecurityManager()
+@st.cache_resource(show_spinner=False)
+def _init_config() -> bool:
+    """One-time config side effects: directories and env overrides"""
+    config.ensure_dirs()
+    config._apply_env_overrides()
+    return True
+
+@st.cache_resource(show_spinner=False)
+def _get_security() -> SecurityManager:
+    """Shared SecurityManager singleton, survives script reloads"""
+    return SecurityManager()
+
+@st.cache_resource(show_spinner=False)
+def _get_audit_writer() -> AuditLogger:
+    """Shared file-backed audit writer (rotating logs/audit.log)"""
+    return AuditLogger()
 
-# Custom CSS
-st.markdown("""
+# One-time startup work, then the shared security manager
+_init_config()
+security = _get_security()
+
+# Custom CSS, held as a constant and injected at most once per session
+_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -74,12 +108,134 @@ st.markdown("""
         border-left: 4px solid #28a745;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+if not st.session_state.get('_css_injected'):
+    st.markdown(_CSS, unsafe_allow_html=True)
+    st.session_state._css_injected = True
+
+# Balance sheet template, built once at import instead of on every rerun
+_TEMPLATE_DF = pd.DataFrame({
+    'Category': ['Cash & Reserves', 'HQLA Level 1', 'HQLA Level 2A',
+                 'Performing Loans', 'Retail Stable', 'Corporate Deposits'],
+    'Amount_M_EUR': [1000, 2000, 500, 15000, 8000, 3000],
+    'Type': ['Asset', 'Asset', 'Asset', 'Asset', 'Liability', 'Liability']
+})
+_TEMPLATE_CSV = _TEMPLATE_DF.to_csv(index=False).encode('utf-8')
+
+# Default stress parameters used when a tab was not visited before saving
+SCENARIO_DEFAULTS = {
+    'retail_stable_runoff': 5.0,
+    'retail_unstable_runoff': 10.0,
+    'corporate_runoff': 40.0,
+    'wholesale_runoff': 100.0,
+    'secured_runoff': 25.0,
+    'hqla_l1_shock': 0.0,
+    'hqla_l2a_shock': -5.0,
+    'hqla_l2b_shock': -15.0,
+    'other_sec_shock': -25.0,
+    'fire_sale_base': 10.0,
+    'fire_sale_increment': 2.0,
+    'funding_spread': 100,
+    'collateral_haircut': 10.0,
+    'loan_migration_rate': 2.0,
+    'provisioning_rate': 50.0,
+    'rwa_increase': 10.0,
+}
+
+# Prefer the faster parser engines when their optional packages are
+# installed (find_spec probes without importing anything at startup)
+_HAS_PYARROW = find_spec('pyarrow') is not None
+_CSV_ENGINE = 'pyarrow' if _HAS_PYARROW else None
+_EXCEL_ENGINE = 'calamine' if find_spec('python_calamine') else None
+_HAS_AGGRID = find_spec('st_aggrid') is not None
+
+# Known columns of the balance-sheet template; explicit dtypes let the
+# parser skip its inference pass (keys absent from a file are ignored,
+# so scenario CSVs flow through the same reader unharmed)
+BS_DTYPES = {
+    'Category': 'string',
+    'Amount_M_EUR': np.float64,
+    'Type': 'category'
+}
+
+@st.cache_data(show_spinner=False)
+def _parse_upload(content: bytes, name: str) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV/Excel file, cached on the file bytes.
+
+    Streamlit reruns the whole script on every widget change while an
+    upload is present; caching makes repeat parses a hash lookup.
+    """
+    if name.lower().endswith('.csv'):
+        if _CSV_ENGINE:
+            return pd.read_csv(io.BytesIO(content), engine=_CSV_ENGINE,
+                               dtype=BS_DTYPES)
+        return pd.read_csv(io.BytesIO(content), dtype=BS_DTYPES)
+    if _EXCEL_ENGINE:
+        return pd.read_excel(io.BytesIO(content), engine=_EXCEL_ENGINE,
+                             dtype=BS_DTYPES)
+    return pd.read_excel(io.BytesIO(content), dtype=BS_DTYPES)
+
+# Uploaded files can be arbitrarily large; only this many rows are
+# shipped to the frontend (st.dataframe serializes every row shown
+# on every rerun)
+_PREVIEW_ROWS = 200
+
+def _preview(df: pd.DataFrame):
+    """Render an uploaded DataFrame capped at _PREVIEW_ROWS rows"""
+    if len(df) > _PREVIEW_ROWS:
+        st.dataframe(df.head(_PREVIEW_ROWS), use_container_width=True)
+        st.caption(f"Showing first {_PREVIEW_ROWS} of {len(df):,} rows")
+    else:
+        st.dataframe(df, use_container_width=True)
+
+@st.cache_resource(show_spinner=False)
+def _scenario_obj(scenario_json: str) -> StressScenario:
+    """
+    Memoized dict -> StressScenario conversion, keyed on canonical JSON.
+
+    Repeated runs of the same saved scenario reuse one object instead
+    of rebuilding (and revalidating) it on every click.
+    """
+    return StressScenario.from_dict(json.loads(scenario_json))
+
+@st.cache_data(show_spinner=False)
+def _validate_scenario(scenario_json: str) -> dict:
+    """
+    Validate scenario parameters via a StressScenario round trip.
+
+    Cached on the canonical JSON of the core parameters (volatile
+    metadata like created_at is attached by the caller afterwards), so
+    re-saving unchanged parameters skips the validation pass.
+    """
+    return StressScenario(**json.loads(scenario_json)).to_dict()
+
+@st.cache_data(show_spinner=False)
+def _build_balance_sheet(bs_input: BalanceSheetInput):
+    """
+    Construct and validate a BalanceSheet from the flat input record.
+
+    Cached so Streamlit reruns (and repeated clicks) with identical inputs
+    skip re-validation and re-summation entirely.
+    """
+    balance_sheet = BalanceSheet.from_input(bs_input)
+    if not balance_sheet.validate():
+        raise ValueError("Balance sheet validation failed")
+    return (
+        balance_sheet,
+        balance_sheet.total_assets(),
+        balance_sheet.total_liabilities(),
+        balance_sheet.total_equity()
+    )
 
 def initialize_session_state():
     """Initialize session state variables"""
     if 'session_id' not in st.session_state:
         st.session_state.session_id = security.generate_session_id()
+        # Pre-truncated ID for the sidebar so the hot rerun path does
+        # not re-slice and re-format on every interaction
+        st.session_state.session_id_short = st.session_state.session_id[:8]
         logger.info(f"New session initialized: {st.session_state.session_id}")
     
     if 'balance_sheet' not in st.session_state:
@@ -87,24 +243,103 @@ def initialize_session_state():
     
     if 'scenarios' not in st.session_state:
         st.session_state.scenarios = []
+
+    if 'scenarios_by_name' not in st.session_state:
+        # Name -> dict index maintained at save time; selection paths
+        # then avoid an O(#scenarios) scan
+        st.session_state.scenarios_by_name = {}
     
     if 'simulation_results' not in st.session_state:
         st.session_state.simulation_results = None
     
     if 'audit_log' not in st.session_state:
-        st.session_state.audit_log = []
+        # Column-oriented buffer rather than a list of dicts: timestamps
+        # live in a packed C int64 array and the string columns are plain
+        # lists, which keeps the per-entry overhead to a few pointers
+        st.session_state.audit_log = {
+            'ts_ns': array('q'),
+            'session_id': [],
+            'action': [],
+            'details': []
+        }
+
+    if 'action_index' not in st.session_state:
+        # Row numbers per action, maintained at append time so the
+        # audit-page action filter is an indexed gather, not a scan
+        st.session_state.action_index = {}
+
+    if 'audit_csv_bytes' not in st.session_state:
+        # CSV body maintained incrementally at append time, so an
+        # unfiltered export is a buffer handoff instead of an O(N) rewrite
+        st.session_state.audit_csv_bytes = bytearray()
+
+# Cap on in-memory audit entries; when it is hit the oldest block is
+# dropped in a single slice so the amortized cost per append stays O(1)
+_AUDIT_MAXLEN = 10_000
+_AUDIT_TRIM = 1_000
+
+# Static widget option lists, hoisted so reruns don't reallocate them
+_PAGES = ("📊 Balance Sheet Setup",
+          "📉 Stress Scenarios",
+          "🔄 Run Simulation",
+          "📈 Results & Analytics",
+          "⚙️ Configuration",
+          "📋 Audit Log")
+_LIQUIDATION_ASSETS = ("Cash", "HQLA Level 1", "HQLA Level 2A", "HQLA Level 2B",
+                       "Other Securities", "Performing Loans", "Real Estate")
+_LIQUIDATION_DEFAULT = ("Cash", "HQLA Level 1", "HQLA Level 2A", "HQLA Level 2B")
+_RECOVERY_ACTIONS = ("Asset Sales", "Capital Raising", "Central Bank Facility",
+                     "Dividend Suspension", "AT1 Conversion")
+
+# Column descriptors for the audit table are pure data; build them once
+# instead of re-allocating three config objects per rerun
+_AUDIT_COLCFG = {
+    'timestamp': st.column_config.DatetimeColumn('Timestamp', format="DD/MM/YYYY HH:mm:ss"),
+    'action': st.column_config.TextColumn('Action'),
+    'session_id': st.column_config.TextColumn('Session ID')
+}
+
+def _audit_csv_row(ts_ns: int, action: str, session_id: str, details: dict) -> bytes:
+    """One audit entry rendered for the incremental CSV buffer"""
+    # details is the only field that can contain commas or quotes, so it
+    # is always CSV-quoted (embedded quotes doubled)
+    detail_str = str(details).replace('"', '""') if details else ''
+    return f'{pd.Timestamp(ts_ns)},{action},{session_id},"{detail_str}"\n'.encode()
 
 def log_user_action(action: str, details: dict = None):
     """Log user actions for audit trail"""
-    timestamp = datetime.now().isoformat()
-    log_entry = {
-        'timestamp': timestamp,
-        'session_id': st.session_state.session_id,
-        'action': action,
-        'details': details or {}
-    }
-    st.session_state.audit_log.append(log_entry)
-    logger.info(f"User action: {action}", extra={'details': details})
+    # Raw nanosecond timestamps are converted to datetimes lazily
+    # (and vectorized) when the audit log is displayed or exported
+    ts_ns = time.time_ns()
+    log = st.session_state.audit_log
+    log['ts_ns'].append(ts_ns)
+    log['session_id'].append(st.session_state.session_id)
+    log['action'].append(action)
+    log['details'].append(details or {})
+    st.session_state.action_index.setdefault(action, []).append(
+        len(log['action']) - 1
+    )
+    st.session_state.audit_csv_bytes.extend(
+        _audit_csv_row(ts_ns, action, st.session_state.session_id, details or {})
+    )
+
+    if len(log['action']) > _AUDIT_MAXLEN:
+        for col in ('ts_ns', 'session_id', 'action', 'details'):
+            log[col] = log[col][_AUDIT_TRIM:]
+        # Row numbers shifted, so rebuild the derived structures
+        index = {}
+        buf = bytearray()
+        for i, (t, a, s, d) in enumerate(
+                zip(log['ts_ns'], log['action'], log['session_id'],
+                    log['details'])):
+            index.setdefault(a, []).append(i)
+            buf.extend(_audit_csv_row(t, a, s, d))
+        st.session_state.action_index = index
+        st.session_state.audit_csv_bytes = buf
+
+    # Durable trail: the in-memory buffer above is bounded, so the
+    # authoritative record is the append-only rotating audit.log
+    _get_audit_writer().log_action(action, st.session_state.session_id, details)
 
 def main():
     """Main application function"""
@@ -119,38 +354,62 @@ def main():
     
     # Sidebar navigation
     with st.sidebar:
-        st.image("https://via.placeholder.com/200x80/1f77b4/ffffff?text=Bank+Simulator", 
-                 use_container_width=True)
+        # Local asset: the remote placeholder URL cost a network fetch
+        # (or at least a resolve) on every rerun
+        st.image("assets/logo.png", use_container_width=True)
         st.markdown("### Navigation")
         
         page = st.radio(
             "Select Module",
-            ["📊 Balance Sheet Setup",
-             "📉 Stress Scenarios",
-             "🔄 Run Simulation",
-             "📈 Results & Analytics",
-             "⚙️ Configuration",
-             "📋 Audit Log"],
+            _PAGES,
             label_visibility="collapsed"
         )
         
         st.markdown("---")
-        st.markdown(f"**Session ID:** `{st.session_state.session_id[:8]}...`")
-        st.markdown(f"**Time:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
+        st.markdown(f"**Session ID:** `{st.session_state.session_id_short}...`")
+        # The clock only has second resolution, so format it at most
+        # once per second instead of on every rerun
+        now_s = int(time.time())
+        if st.session_state.get('_clock_sec') != now_s:
+            st.session_state._clock_sec = now_s
+            st.session_state._clock_str = time.strftime('%Y-%m-%d %H:%M:%S')
+        st.markdown(f"**Time:** {st.session_state._clock_str}")
+        st.checkbox("Debug mode", key="debug")
+
     # Route to appropriate page
-    if page == "📊 Balance Sheet Setup":
-        show_balance_sheet_setup()
-    elif page == "📉 Stress Scenarios":
-        show_stress_scenarios()
-    elif page == "🔄 Run Simulation":
-        show_simulation()
-    elif page == "📈 Results & Analytics":
-        show_results()
-    elif page == "⚙️ Configuration":
-        show_configuration()
-    elif page == "📋 Audit Log":
-        show_audit_log()
+    _ROUTES[page]()
+
+# Manual-entry rows: (BalanceSheetInput field, display label, default €M)
+_ASSET_FIELDS = (
+    ('cash_reserves', 'Cash & Central Bank Reserves', 1000.0),
+    ('hqla_level1', 'Level 1 HQLA', 2000.0),
+    ('hqla_level2a', 'Level 2A HQLA', 500.0),
+    ('hqla_level2b', 'Level 2B HQLA', 300.0),
+    ('performing_loans', 'Performing Loans', 15000.0),
+    ('npl', 'Non-Performing Loans', 500.0),
+    ('real_estate', 'Real Estate / Illiquid Assets', 1000.0),
+    ('other_securities', 'Other Marketable Securities', 800.0),
+    ('other_assets', 'Other Assets', 200.0),
+)
+_LIAB_FIELDS = (
+    ('retail_stable', 'Stable Retail Deposits', 8000.0),
+    ('retail_unstable', 'Less Stable Retail Deposits', 4000.0),
+    ('corporate_deposits', 'Corporate Deposits', 3000.0),
+    ('wholesale_funding', 'Wholesale Funding', 2000.0),
+    ('secured_funding', 'Secured Funding', 1500.0),
+    ('other_liabilities', 'Other Liabilities', 500.0),
+    ('cet1', 'CET1 Capital', 1500.0),
+    ('at1', 'AT1 Capital', 200.0),
+    ('tier2', 'Tier 2 Capital', 300.0),
+)
+
+@st.cache_data(show_spinner=False)
+def _entry_frame(fields: tuple) -> pd.DataFrame:
+    """Default single-column entry table for the manual-entry editors"""
+    return pd.DataFrame(
+        {'Amount_M_EUR': [default for _, _, default in fields]},
+        index=[label for _, label, _ in fields]
+    )
 
 def show_balance_sheet_setup():
     """Balance Sheet Setup Page"""
@@ -163,110 +422,60 @@ def show_balance_sheet_setup():
         
         col1, col2 = st.columns(2)
         
+        # One editor per column instead of 18 number_inputs: a single
+        # widget delta per edit rather than one round-trip per field
         with col1:
             st.markdown("#### Assets (€ millions)")
-            
-            with st.expander("💰 Cash & Reserves", expanded=True):
-                cash_reserves = st.number_input("Cash & Central Bank Reserves", 
-                                                min_value=0.0, value=1000.0, step=10.0)
-            
-            with st.expander("💎 HQLA Securities"):
-                hqla_level1 = st.number_input("Level 1 HQLA", min_value=0.0, value=2000.0, step=10.0)
-                hqla_level2a = st.number_input("Level 2A HQLA", min_value=0.0, value=500.0, step=10.0)
-                hqla_level2b = st.number_input("Level 2B HQLA", min_value=0.0, value=300.0, step=10.0)
-            
-            with st.expander("📚 Loan Book"):
-                performing_loans = st.number_input("Performing Loans", 
-                                                   min_value=0.0, value=15000.0, step=100.0)
-                npl = st.number_input("Non-Performing Loans", 
-                                     min_value=0.0, value=500.0, step=10.0)
-            
-            with st.expander("🏢 Other Assets"):
-                real_estate = st.number_input("Real Estate / Illiquid Assets", 
-                                             min_value=0.0, value=1000.0, step=10.0)
-                other_securities = st.number_input("Other Marketable Securities", 
-                                                   min_value=0.0, value=800.0, step=10.0)
-                other_assets = st.number_input("Other Assets", 
-                                              min_value=0.0, value=200.0, step=10.0)
-        
+            assets_df = st.data_editor(
+                _entry_frame(_ASSET_FIELDS),
+                num_rows="fixed",
+                use_container_width=True,
+                key="assets_editor"
+            )
+
         with col2:
-            st.markdown("#### Liabilities (€ millions)")
-            
-            with st.expander("💳 Retail Deposits", expanded=True):
-                retail_stable = st.number_input("Stable Retail Deposits", 
-                                               min_value=0.0, value=8000.0, step=100.0)
-                retail_unstable = st.number_input("Less Stable Retail Deposits", 
-                                                 min_value=0.0, value=4000.0, step=100.0)
-            
-            with st.expander("🏢 Corporate & Wholesale"):
-                corporate_deposits = st.number_input("Corporate Deposits", 
-                                                    min_value=0.0, value=3000.0, step=100.0)
-                wholesale_funding = st.number_input("Wholesale Funding", 
-                                                   min_value=0.0, value=2000.0, step=100.0)
-                secured_funding = st.number_input("Secured Funding", 
-                                                 min_value=0.0, value=1500.0, step=100.0)
-            
-            with st.expander("💼 Other Liabilities & Equity"):
-                other_liabilities = st.number_input("Other Liabilities", 
-                                                   min_value=0.0, value=500.0, step=10.0)
-                
-                st.markdown("**Equity**")
-                cet1 = st.number_input("CET1 Capital", min_value=0.0, value=1500.0, step=10.0)
-                at1 = st.number_input("AT1 Capital", min_value=0.0, value=200.0, step=10.0)
-                tier2 = st.number_input("Tier 2 Capital", min_value=0.0, value=300.0, step=10.0)
-        
+            st.markdown("#### Liabilities & Equity (€ millions)")
+            liab_df = st.data_editor(
+                _entry_frame(_LIAB_FIELDS),
+                num_rows="fixed",
+                use_container_width=True,
+                key="liabilities_editor"
+            )
+
         # Validation and creation
         if st.button("✅ Create Balance Sheet", type="primary"):
             try:
-                # Create balance sheet object
-                bs_data = {
-                    'assets': {
-                        'cash_reserves': cash_reserves,
-                        'hqla_level1': hqla_level1,
-                        'hqla_level2a': hqla_level2a,
-                        'hqla_level2b': hqla_level2b,
-                        'performing_loans': performing_loans,
-                        'npl': npl,
-                        'real_estate': real_estate,
-                        'other_securities': other_securities,
-                        'other_assets': other_assets
-                    },
-                    'liabilities': {
-                        'retail_stable': retail_stable,
-                        'retail_unstable': retail_unstable,
-                        'corporate_deposits': corporate_deposits,
-                        'wholesale_funding': wholesale_funding,
-                        'secured_funding': secured_funding,
-                        'other_liabilities': other_liabilities
-                    },
-                    'equity': {
-                        'cet1': cet1,
-                        'at1': at1,
-                        'tier2': tier2
-                    }
+                # Capture inputs in a flat, hashable record
+                values = {
+                    key: float(assets_df['Amount_M_EUR'].iloc[i])
+                    for i, (key, _, _) in enumerate(_ASSET_FIELDS)
                 }
-                
-                # Validate
-                balance_sheet = BalanceSheet(bs_data)
-                if balance_sheet.validate():
-                    st.session_state.balance_sheet = balance_sheet
-                    log_user_action("balance_sheet_created", {'method': 'manual'})
-                    st.success("✅ Balance Sheet created and validated successfully!")
-                    
-                    # Show summary
-                    total_assets = balance_sheet.total_assets()
-                    total_liabilities = balance_sheet.total_liabilities()
-                    total_equity = balance_sheet.total_equity()
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    col1.metric("Total Assets", f"€{total_assets:,.0f}M")
-                    col2.metric("Total Liabilities", f"€{total_liabilities:,.0f}M")
-                    col3.metric("Total Equity", f"€{total_equity:,.0f}M")
-                    col4.metric("Balance Check", 
-                               f"€{abs(total_assets - total_liabilities - total_equity):,.2f}M")
-                else:
-                    st.error("❌ Balance Sheet validation failed!")
-                    
+                values.update(
+                    (key, float(liab_df['Amount_M_EUR'].iloc[i]))
+                    for i, (key, _, _) in enumerate(_LIAB_FIELDS)
+                )
+                bs_input = BalanceSheetInput(**values)
+
+                # Validate (cached on the input record)
+                balance_sheet, total_assets, total_liabilities, total_equity = \
+                    _build_balance_sheet(bs_input)
+                st.session_state.balance_sheet = balance_sheet
+                # Stable digest of the sheet, used as a cache key by
+                # consumers (e.g. the mock-results fallback)
+                st.session_state.balance_sheet_hash = security.hash_sensitive_data(
+                    json.dumps(balance_sheet.data, sort_keys=True)
+                )
+                log_user_action("balance_sheet_created", {'method': 'manual'})
+                st.success("✅ Balance Sheet created and validated successfully!")
+
+                # Show summary
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Total Assets", f"€{total_assets:,.0f}M")
+                col2.metric("Total Liabilities", f"€{total_liabilities:,.0f}M")
+                col3.metric("Total Equity", f"€{total_equity:,.0f}M")
+                col4.metric("Balance Check",
+                           f"€{abs(total_assets - total_liabilities - total_equity):,.2f}M")
+
             except Exception as e:
                 logger.error(f"Error creating balance sheet: {str(e)}")
                 st.error(f"❌ Error: {str(e)}")
@@ -288,13 +497,10 @@ def show_balance_sheet_setup():
                     st.error("❌ File validation failed. Please check file type and size.")
                     return
                 
-                # Read file
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                else:
-                    df = pd.read_excel(uploaded_file)
-                
-                st.dataframe(df, use_container_width=True)
+                # Read file (cached on file bytes)
+                df = _parse_upload(uploaded_file.getvalue(), uploaded_file.name)
+
+                _preview(df)
                 
                 if st.button("Import Balance Sheet"):
                     # Process and create balance sheet
@@ -310,21 +516,11 @@ def show_balance_sheet_setup():
         st.subheader("Download Template")
         st.markdown("Download a template file to fill in your balance sheet data")
         
-        # Create template
-        template_data = {
-            'Category': ['Cash & Reserves', 'HQLA Level 1', 'HQLA Level 2A', 
-                        'Performing Loans', 'Retail Stable', 'Corporate Deposits'],
-            'Amount_M_EUR': [1000, 2000, 500, 15000, 8000, 3000],
-            'Type': ['Asset', 'Asset', 'Asset', 'Asset', 'Liability', 'Liability']
-        }
-        template_df = pd.DataFrame(template_data)
-        
-        st.dataframe(template_df, use_container_width=True)
-        
-        csv = template_df.to_csv(index=False)
+        st.dataframe(_TEMPLATE_DF, use_container_width=True)
+
         st.download_button(
             label="📥 Download CSV Template",
-            data=csv,
+            data=_TEMPLATE_CSV,
             file_name="balance_sheet_template.csv",
             mime="text/csv"
         )
@@ -358,7 +554,11 @@ def show_stress_scenarios():
         )
     
     st.markdown("---")
-    
+
+    # Parameters captured from whichever tabs were rendered; merged with
+    # SCENARIO_DEFAULTS at save time
+    tab_state = {}
+
     # Scenario tabs
     tab1, tab2, tab3, tab4 = st.tabs([
         "💸 Deposit Withdrawals",
@@ -380,25 +580,29 @@ def show_stress_scenarios():
             col1, col2 = st.columns(2)
             
             with col1:
-                retail_stable_runoff = st.slider("Stable Retail Run-off %", 0, 100, 5)
-                retail_unstable_runoff = st.slider("Unstable Retail Run-off %", 0, 100, 10)
-                corporate_runoff = st.slider("Corporate Deposit Run-off %", 0, 100, 40)
-            
+                tab_state['retail_stable_runoff'] = st.slider("Stable Retail Run-off %", 0, 100, 5)
+                tab_state['retail_unstable_runoff'] = st.slider("Unstable Retail Run-off %", 0, 100, 10)
+                tab_state['corporate_runoff'] = st.slider("Corporate Deposit Run-off %", 0, 100, 40)
+
             with col2:
-                wholesale_runoff = st.slider("Wholesale Funding Run-off %", 0, 100, 100)
-                secured_runoff = st.slider("Secured Funding Run-off %", 0, 100, 25)
+                tab_state['wholesale_runoff'] = st.slider("Wholesale Funding Run-off %", 0, 100, 100)
+                tab_state['secured_runoff'] = st.slider("Secured Funding Run-off %", 0, 100, 25)
         
         elif scenario_type == "Custom Period-by-Period":
             st.info("📊 Enter withdrawal amounts for each period (or upload CSV)")
             
-            # Create editable dataframe
-            periods_df = pd.DataFrame({
-                'Period': range(1, int(num_periods) + 1),
-                'Retail_Stable_Withdrawal': [0.0] * int(num_periods),
-                'Retail_Unstable_Withdrawal': [0.0] * int(num_periods),
-                'Corporate_Withdrawal': [0.0] * int(num_periods),
-                'Wholesale_Withdrawal': [0.0] * int(num_periods)
-            })
+            # Create editable dataframe from one contiguous NumPy buffer
+            # instead of four boxed Python float lists. float32 is ample
+            # for hand-entered EUR-million amounts and halves the buffer
+            # shipped to the editor and back
+            n = int(num_periods)
+            periods_df = pd.DataFrame(
+                np.zeros((n, 4), dtype=np.float32),
+                columns=['Retail_Stable_Withdrawal', 'Retail_Unstable_Withdrawal',
+                         'Corporate_Withdrawal', 'Wholesale_Withdrawal'],
+                copy=False
+            )
+            periods_df.insert(0, 'Period', np.arange(1, n + 1, dtype=np.int32))
             
             edited_df = st.data_editor(
                 periods_df,
@@ -416,11 +620,11 @@ def show_stress_scenarios():
             - Wholesale: 100%
             """)
             # Set default values for regulatory standard
-            retail_stable_runoff = 5
-            retail_unstable_runoff = 10
-            corporate_runoff = 40
-            wholesale_runoff = 100
-            secured_runoff = 25
+            tab_state['retail_stable_runoff'] = 5
+            tab_state['retail_unstable_runoff'] = 10
+            tab_state['corporate_runoff'] = 40
+            tab_state['wholesale_runoff'] = 100
+            tab_state['secured_runoff'] = 25
     
     with tab2:
         st.subheader("Market Stress Parameters")
@@ -429,20 +633,20 @@ def show_stress_scenarios():
         
         with col1:
             st.markdown("**Security Price Shocks**")
-            hqla_l1_shock = st.slider("HQLA Level 1 Price Shock %", -20, 0, 0)
-            hqla_l2a_shock = st.slider("HQLA Level 2A Price Shock %", -30, 0, -5)
-            hqla_l2b_shock = st.slider("HQLA Level 2B Price Shock %", -50, 0, -15)
-            other_sec_shock = st.slider("Other Securities Price Shock %", -60, 0, -25)
-        
+            tab_state['hqla_l1_shock'] = st.slider("HQLA Level 1 Price Shock %", -20, 0, 0)
+            tab_state['hqla_l2a_shock'] = st.slider("HQLA Level 2A Price Shock %", -30, 0, -5)
+            tab_state['hqla_l2b_shock'] = st.slider("HQLA Level 2B Price Shock %", -50, 0, -15)
+            tab_state['other_sec_shock'] = st.slider("Other Securities Price Shock %", -60, 0, -25)
+
         with col2:
             st.markdown("**Fire-sale Discounts**")
-            fire_sale_base = st.slider("Base Fire-sale Discount %", 0, 50, 10)
-            fire_sale_increment = st.slider("Incremental Discount per Volume %", 0, 20, 2,
-                                           help="Additional discount for large sales")
-            
+            tab_state['fire_sale_base'] = st.slider("Base Fire-sale Discount %", 0, 50, 10)
+            tab_state['fire_sale_increment'] = st.slider("Incremental Discount per Volume %", 0, 20, 2,
+                                                         help="Additional discount for large sales")
+
             st.markdown("**Funding Stress**")
-            funding_spread = st.slider("Funding Spread Increase (bps)", 0, 1000, 100)
-            collateral_haircut = st.slider("Collateral Haircut Increase %", 0, 50, 10)
+            tab_state['funding_spread'] = st.slider("Funding Spread Increase (bps)", 0, 1000, 100)
+            tab_state['collateral_haircut'] = st.slider("Collateral Haircut Increase %", 0, 50, 10)
     
     with tab3:
         st.subheader("Credit Deterioration")
@@ -450,20 +654,20 @@ def show_stress_scenarios():
         col1, col2 = st.columns(2)
         
         with col1:
-            loan_migration_rate = st.slider(
+            tab_state['loan_migration_rate'] = st.slider(
                 "Loan Migration to NPL %",
                 0.0, 20.0, 2.0,
                 help="Percentage of performing loans migrating to NPL"
             )
-            
-            provisioning_rate = st.slider(
+
+            tab_state['provisioning_rate'] = st.slider(
                 "Additional Provisioning %",
                 0, 100, 50,
                 help="Provisioning rate on new NPLs"
             )
-        
+
         with col2:
-            rwa_increase = st.slider(
+            tab_state['rwa_increase'] = st.slider(
                 "Risk-Weighted Assets Increase %",
                 0, 50, 10,
                 help="Increase in RWA due to credit quality deterioration"
@@ -482,8 +686,8 @@ def show_stress_scenarios():
         if scenario_file is not None:
             try:
                 if security.validate_file_upload(scenario_file):
-                    scenario_df = pd.read_csv(scenario_file)
-                    st.dataframe(scenario_df, use_container_width=True)
+                    scenario_df = _parse_upload(scenario_file.getvalue(), scenario_file.name)
+                    _preview(scenario_df)
                     
                     if st.button("Import Scenario"):
                         st.success("✅ Scenario imported successfully!")
@@ -500,41 +704,45 @@ def show_stress_scenarios():
         
         if st.button("💾 Save Scenario", type="primary", use_container_width=True):
             try:
-                # ✅ FIX: Create complete scenario dict with all required parameters
+                # Merge captured tab values over the defaults in one pass
+                params = {**SCENARIO_DEFAULTS, **tab_state}
+
                 scenario_dict = {
                     'name': scenario_name,
                     'time_granularity': time_granularity,
                     'num_periods': int(num_periods),
                     'runoff_rates': {
-                        'retail_stable': float(retail_stable_runoff) if 'retail_stable_runoff' in locals() else 5.0,
-                        'retail_unstable': float(retail_unstable_runoff) if 'retail_unstable_runoff' in locals() else 10.0,
-                        'corporate_deposits': float(corporate_runoff) if 'corporate_runoff' in locals() else 40.0,
-                        'wholesale_funding': float(wholesale_runoff) if 'wholesale_runoff' in locals() else 100.0,
-                        'secured_funding': float(secured_runoff) if 'secured_runoff' in locals() else 25.0
+                        'retail_stable': float(params['retail_stable_runoff']),
+                        'retail_unstable': float(params['retail_unstable_runoff']),
+                        'corporate_deposits': float(params['corporate_runoff']),
+                        'wholesale_funding': float(params['wholesale_runoff']),
+                        'secured_funding': float(params['secured_runoff'])
                     },
                     'security_shocks': {
-                        'hqla_level1': float(hqla_l1_shock) if 'hqla_l1_shock' in locals() else 0.0,
-                        'hqla_level2a': float(hqla_l2a_shock) if 'hqla_l2a_shock' in locals() else -5.0,
-                        'hqla_level2b': float(hqla_l2b_shock) if 'hqla_l2b_shock' in locals() else -15.0,
-                        'other_securities': float(other_sec_shock) if 'other_sec_shock' in locals() else -25.0
+                        'hqla_level1': float(params['hqla_l1_shock']),
+                        'hqla_level2a': float(params['hqla_l2a_shock']),
+                        'hqla_level2b': float(params['hqla_l2b_shock']),
+                        'other_securities': float(params['other_sec_shock'])
                     },
-                    'fire_sale_discount': float(fire_sale_base) if 'fire_sale_base' in locals() else 10.0,
-                    'fire_sale_increment': float(fire_sale_increment) if 'fire_sale_increment' in locals() else 2.0,
-                    'funding_spread_increase': int(funding_spread) if 'funding_spread' in locals() else 100,
-                    'collateral_haircut_increase': float(collateral_haircut) if 'collateral_haircut' in locals() else 10.0,
-                    'loan_migration_rate': float(loan_migration_rate) if 'loan_migration_rate' in locals() else 2.0,
-                    'provisioning_rate': float(provisioning_rate) if 'provisioning_rate' in locals() else 50.0,
-                    'rwa_increase': float(rwa_increase) if 'rwa_increase' in locals() else 10.0,
-                    'description': f"Created on {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                    'created_at': datetime.now().isoformat()
+                    'fire_sale_discount': float(params['fire_sale_base']),
+                    'fire_sale_increment': float(params['fire_sale_increment']),
+                    'funding_spread_increase': int(params['funding_spread']),
+                    'collateral_haircut_increase': float(params['collateral_haircut']),
+                    'loan_migration_rate': float(params['loan_migration_rate']),
+                    'provisioning_rate': float(params['provisioning_rate']),
+                    'rwa_increase': float(params['rwa_increase'])
                 }
-                
-                # Validate by creating StressScenario object
-                scenario_obj = StressScenario(**scenario_dict)
-                validated_dict = scenario_obj.to_dict()
-                
+
+                # Validate via StressScenario (cached on the canonical JSON),
+                # then attach the volatile metadata
+                validated_dict = _validate_scenario(json.dumps(scenario_dict, sort_keys=True))
+                validated_dict['description'] = f"Created on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                validated_dict['created_at'] = datetime.now().isoformat()
+
                 # Store validated dict
                 st.session_state.scenarios.append(validated_dict)
+                st.session_state.scenarios_by_name[scenario_name] = validated_dict
+
                 log_user_action("scenario_saved", {'name': scenario_name})
                 st.success(f"✅ Scenario '{scenario_name}' saved successfully!")
                 
@@ -579,17 +787,26 @@ def show_simulation():
     col1, col2 = st.columns(2)
     
     with col1:
+        # Rebuild the option list only when scenarios were added/removed;
+        # the list comprehension otherwise runs on every widget rerun
+        cached = st.session_state.get('_scenario_names_cache')
+        if cached is None or cached[0] != len(st.session_state.scenarios):
+            cached = (
+                len(st.session_state.scenarios),
+                tuple(s['name'] for s in st.session_state.scenarios)
+            )
+            st.session_state._scenario_names_cache = cached
+
         selected_scenario = st.selectbox(
             "Select Scenario",
-            [s['name'] for s in st.session_state.scenarios]
+            cached[1]
         )
         
         st.markdown("**Liquidation Priority**")
         liquidation_order = st.multiselect(
             "Asset Liquidation Order (drag to reorder)",
-            ["Cash", "HQLA Level 1", "HQLA Level 2A", "HQLA Level 2B", 
-             "Other Securities", "Performing Loans", "Real Estate"],
-            default=["Cash", "HQLA Level 1", "HQLA Level 2A", "HQLA Level 2B"]
+            _LIQUIDATION_ASSETS,
+            default=_LIQUIDATION_DEFAULT
         )
     
     with col2:
@@ -605,8 +822,7 @@ def show_simulation():
         if enable_recovery:
             recovery_actions = st.multiselect(
                 "Available Recovery Actions",
-                ["Asset Sales", "Capital Raising", "Central Bank Facility", 
-                 "Dividend Suspension", "AT1 Conversion"],
+                _RECOVERY_ACTIONS,
                 default=["Central Bank Facility"]
             )
     
@@ -617,14 +833,16 @@ def show_simulation():
         with st.spinner("Running simulation... This may take a moment."):
             try:
                 # ✅ FIX: Convert scenario dict to StressScenario object before passing to engine
-                # Find the selected scenario dict
-                selected_scenario_dict = next(
-                    (s for s in st.session_state.scenarios if s['name'] == selected_scenario),
+                # O(1) lookup via the name index kept at save time
+                selected_scenario_dict = st.session_state.scenarios_by_name.get(
+                    selected_scenario,
                     st.session_state.scenarios[0]
                 )
-                
-                # Convert dict to StressScenario object
-                scenario_obj = StressScenario.from_dict(selected_scenario_dict)
+
+                # Convert dict to StressScenario object (memoized)
+                scenario_obj = _scenario_obj(
+                    json.dumps(selected_scenario_dict, sort_keys=True)
+                )
                 
                 # Debug info
                 st.info(f"🔍 **Simulation Details:**\n"
@@ -646,14 +864,20 @@ def show_simulation():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
+                # Throttle UI updates: every callback crosses the
+                # Streamlit frontend protocol, so cap at ~20/sec
+                last_update = [0.0]
+
+                def _progress_cb(p, msg):
+                    now = time.monotonic()
+                    if now - last_update[0] > 0.05 or p >= 100:
+                        progress_bar.progress(p)
+                        status_text.text(msg)
+                        last_update[0] = now
+
                 # Mock results if engine doesn't return proper results
                 try:
-                    results = engine.run_simulation(
-                        progress_callback=lambda p, msg: (
-                            progress_bar.progress(p),
-                            status_text.text(msg)
-                        )
-                    )
+                    results = engine.run_simulation(progress_callback=_progress_cb)
                 except Exception as sim_error:
                     st.warning(f"⚠️ Simulation engine error: {str(sim_error)}")
                     st.info("📊 Generating mock results for testing...")
@@ -696,68 +920,211 @@ def show_simulation():
                 st.info("📊 View detailed results in the 'Results & Analytics' page")
                 
             except Exception as e:
-                logger.error(f"Simulation error: {str(e)}")
+                # Full traceback goes to the log; rendering it in the UI
+                # (a stack walk plus string build) is debug-only
+                logger.error(f"Simulation error: {str(e)}", exc_info=True)
                 st.error(f"❌ Simulation failed: {str(e)}")
-                import traceback
-                st.code(traceback.format_exc())
+                if st.session_state.get('debug'):
+                    st.code(traceback.format_exc())
+
+    # Batch run: scenarios are independent, so farm them out to worker
+    # processes instead of looping serially under the GIL
+    if len(st.session_state.scenarios) > 1:
+        if st.button("⏩ Run All Scenarios (parallel)", use_container_width=True):
+            with st.spinner("Running all scenarios in parallel..."):
+                try:
+                    jobs = [
+                        (st.session_state.balance_sheet.data, s, liquidation_order)
+                        for s in st.session_state.scenarios
+                    ]
+
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    batch_results = {}
+
+                    ctx = get_context('spawn')
+                    n_workers = min(len(jobs), os.cpu_count() or 1)
+                    with ctx.Pool(processes=n_workers) as pool:
+                        # imap_unordered lets the progress bar advance as
+                        # each scenario finishes, not in submission order
+                        for done, (name, results) in enumerate(
+                                pool.imap_unordered(run_scenario_job, jobs), start=1):
+                            batch_results[name] = results
+                            progress_bar.progress(done / len(jobs))
+                            status_text.text(f"Completed {done}/{len(jobs)}: {name}")
+
+                    st.session_state.batch_results = batch_results
+                    log_user_action("batch_simulation_completed",
+                                    {'scenarios': len(batch_results)})
 
+                    st.success(f"✅ Completed {len(batch_results)} scenarios")
+
+                    summary_df = pd.DataFrame([
+                        {
+                            'Scenario': name,
+                            'Survival Horizon': res.get('survival_horizon', 0),
+                            'Breach Type': res.get('breach_type', 'None'),
+                            'Final LCR (%)': res.get('final_lcr', 0),
+                            'Final CET1 (%)': res.get('final_cet1', 0)
+                        }
+                        for name, res in batch_results.items()
+                    ])
+                    st.dataframe(summary_df, use_container_width=True)
+
+                except Exception as e:
+                    logger.error(f"Batch simulation error: {str(e)}")
+                    st.error(f"❌ Batch simulation failed: {str(e)}")
+
+
+def _mock_kernel(n: int) -> dict:
+    """
+    Numeric core of the mock-results fallback, computed column-wise.
+
+    All per-period series are linear decays of the period index, so one
+    arange plus broadcast arithmetic replaces the Python loop. (A numba
+    njit kernel was considered but numba is not a dependency of this
+    project; plain NumPy already does the work at C speed.)
+    """
+    p = np.arange(n, dtype=np.float64)
+    return {
+        'period': np.arange(1, n + 1),
+        'cash': np.maximum(0, 1000 - p * 20),
+        'hqla_total': np.maximum(0, 3000 - p * 50),
+        'total_assets': np.maximum(0, 20000 - p * 100),
+        'total_liabilities': np.maximum(0, 18000 - p * 90),
+        'equity': np.maximum(0, 2000 - p * 10),
+        'lcr': np.maximum(0, 120 - p * 2),
+        'nsfr': np.maximum(0, 110 - p * 1.5),
+        'cet1_ratio': np.maximum(0, 12 - p * 0.15),
+        'liquidity_buffer': np.maximum(0, 2000 - p * 40),
+        'deposit_runoff': p * 50,
+        'asset_sales': p * 30
+    }
 
 def generate_mock_results(scenario_obj, balance_sheet):
     """Generate mock simulation results for testing"""
-    num_periods = scenario_obj.num_periods
-    
-    # Generate period-by-period data
-    periods_data = []
-    for period in range(num_periods):
-        period_data = {
-            'period': period + 1,
-            'cash': max(0, 1000 - period * 20),
-            'hqla_total': max(0, 3000 - period * 50),
-            'total_assets': max(0, 20000 - period * 100),
-            'total_liabilities': max(0, 18000 - period * 90),
-            'equity': max(0, 2000 - period * 10),
-            'lcr': max(0, 120 - period * 2),
-            'nsfr': max(0, 110 - period * 1.5),
-            'cet1_ratio': max(0, 12 - period * 0.15),
-            'liquidity_buffer': max(0, 2000 - period * 40),
-            'deposit_runoff': period * 50,
-            'asset_sales': period * 30
-        }
-        periods_data.append(period_data)
-    
-    # Determine survival horizon
+    results = _mock_results_cached(
+        scenario_obj.name,
+        scenario_obj.time_granularity,
+        scenario_obj.num_periods,
+        st.session_state.get('balance_sheet_hash', '')
+    )
+    # The cache hands back a fresh copy, so stamping it is safe
+    results['simulation_timestamp'] = datetime.now().isoformat()
+    return results
+
+@st.cache_data(show_spinner=False)
+def _mock_results_cached(name: str, time_granularity: str,
+                         num_periods: int, bs_hash: str) -> dict:
+    """
+    Mock results memoized per (scenario, balance sheet) so reruns that
+    fall back to mock data skip the rebuild. bs_hash keys the cache
+    even though the mock series don't read the balance sheet yet.
+    """
+    # Period-by-period data straight from the vectorized kernel. Kept as
+    # a dict of column arrays (SoA) — pd.DataFrame(periods_data) accepts
+    # it unchanged, and the aggregations below become array ops instead
+    # of per-row dict lookups.
+    periods_data = _mock_kernel(num_periods)
+
+    # Determine survival horizon. The nested where encodes the breach
+    # priority (LCR before CET1 before cash) per period in one array, so a
+    # single argmax scan yields both the first breached period and its
+    # type - no mask stack, no second argmax down the type axis.
     survival_horizon = num_periods
     breach_type = "None"
-    for i, p in enumerate(periods_data):
-        if p['lcr'] < 100:
-            survival_horizon = i
-            breach_type = "LCR Breach"
-            break
-        elif p['cet1_ratio'] < 4.5:
-            survival_horizon = i
-            breach_type = "CET1 Breach"
-            break
-        elif p['cash'] <= 0:
-            survival_horizon = i
-            breach_type = "Cash Depletion"
-            break
-    
+    priority = np.where(periods_data['lcr'] < 100, 1,
+               np.where(periods_data['cet1_ratio'] < 4.5, 2,
+               np.where(periods_data['cash'] <= 0, 3, 0)))
+    if priority.any():
+        idx = int(np.argmax(priority > 0))
+        survival_horizon = idx
+        breach_type = ("LCR Breach", "CET1 Breach",
+                       "Cash Depletion")[priority[idx] - 1]
+
+    equity = periods_data['equity']
     results = {
         'survival_horizon': survival_horizon,
         'breach_type': breach_type,
-        'final_lcr': periods_data[-1]['lcr'],
-        'final_cet1': periods_data[-1]['cet1_ratio'],
-        'asset_depletion': sum(p['asset_sales'] for p in periods_data),
-        'capital_erosion': (periods_data[0]['equity'] - periods_data[-1]['equity']) / periods_data[0]['equity'] * 100,
+        'final_lcr': float(periods_data['lcr'][-1]),
+        'final_cet1': float(periods_data['cet1_ratio'][-1]),
+        'asset_depletion': float(periods_data['asset_sales'].sum()),
+        'capital_erosion': float((equity[0] - equity[-1]) / equity[0] * 100),
         'periods_data': periods_data,
-        'scenario_name': scenario_obj.name,
-        'time_granularity': scenario_obj.time_granularity,
-        'num_periods': num_periods,
-        'simulation_timestamp': datetime.now().isoformat()
+        'scenario_name': name,
+        'time_granularity': time_granularity,
+        'num_periods': num_periods
     }
-    
+
     return results
 
+# Column selections and display names for the results tables. rename()
+# already returns a new frame, so no .copy() is needed before relabelling.
+_SUMMARY_COLS = ['period', 'cash', 'hqla_total', 'total_assets', 'total_liabilities', 'equity']
+_SUMMARY_RENAME = {'period': 'Period', 'cash': 'Cash', 'hqla_total': 'HQLA Total',
+                   'total_assets': 'Total Assets', 'total_liabilities': 'Total Liabilities',
+                   'equity': 'Equity'}
+_LIQUIDITY_COLS = ['period', 'lcr', 'nsfr', 'liquidity_buffer']
+_LIQUIDITY_RENAME = {'period': 'Period', 'lcr': 'LCR (%)', 'nsfr': 'NSFR (%)',
+                     'liquidity_buffer': 'Liquidity Buffer (€M)'}
+_CAPITAL_COLS = ['period', 'cet1_ratio', 'equity']
+_CAPITAL_RENAME = {'period': 'Period', 'cet1_ratio': 'CET1 Ratio (%)',
+                   'equity': 'Total Equity (€M)'}
+
+@st.cache_data(show_spinner=False)
+def _results_df(stamp: str, _periods_data) -> pd.DataFrame:
+    """
+    Periods DataFrame for the results page, built once per simulation run.
+
+    _periods_data carries the actual columns but is underscore-prefixed so
+    Streamlit keys the cache on the run timestamp alone instead of hashing
+    every array on each rerun.
+    """
+    return pd.DataFrame(_periods_data)
+
+@st.cache_data(show_spinner=False)
+def _breach_periods(stamp: str, _df: pd.DataFrame) -> tuple:
+    """
+    Comma-joined period lists where LCR / CET1 sit below their regulatory
+    minimums. A boolean mask over the raw arrays replaces the filtered
+    DataFrame copies the tabs used to rebuild on every rerun.
+    """
+    period = _df['period'].to_numpy()
+    return (
+        ', '.join(map(str, period[_df['lcr'].to_numpy() < 100])),
+        ', '.join(map(str, period[_df['cet1_ratio'].to_numpy() < 4.5])),
+    )
+
+@st.cache_data(show_spinner=False)
+def _chart_frames(stamp: str, _df: pd.DataFrame) -> tuple:
+    """
+    Pre-indexed frames for the three line charts, cached per run.
+
+    Casting to float32 halves the serialized chart payload with no
+    visible difference at chart resolution, and indexing by Period here
+    spares st.line_chart the set_index/dtype inference on every rerun.
+    """
+    idx = pd.Index(_df['period'], name='Period')
+
+    def frame(cols):
+        return pd.DataFrame(
+            {label: _df[col].to_numpy(dtype=np.float32) for col, label in cols},
+            index=idx
+        )
+
+    return (
+        frame((('total_assets', 'Total Assets'),
+               ('total_liabilities', 'Total Liabilities'),
+               ('equity', 'Equity'))),
+        frame((('lcr', 'LCR (%)'), ('nsfr', 'NSFR (%)'))),
+        frame((('cet1_ratio', 'CET1 Ratio (%)'),)),
+    )
+
+@st.cache_data(show_spinner=False)
+def _display_df(stamp: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Detailed-analysis frame with prettified column names, cached per run."""
+    return _df.rename(columns={c: c.replace('_', ' ').title() for c in _df.columns})
+
 def show_results():
     """Results & Analytics Page"""
     st.header("📈 Simulation Results & Analytics")
@@ -812,7 +1179,17 @@ def show_results():
     
     if not periods_data:
         st.warning("⚠️ No detailed period data available. Results may be incomplete.")
-    
+    else:
+        # Built once for all four tabs; Streamlit reruns this function on
+        # every widget interaction, so the construction is cached per run
+        df = _results_df(results.get('simulation_timestamp', ''), periods_data)
+        lcr_breach_periods, cet1_breach_periods = _breach_periods(
+            results.get('simulation_timestamp', ''), df
+        )
+        balance_chart, liquidity_chart, capital_chart = _chart_frames(
+            results.get('simulation_timestamp', ''), df
+        )
+
     # Visualizations
     tab1, tab2, tab3, tab4 = st.tabs([
         "Balance Sheet Evolution",
@@ -825,23 +1202,12 @@ def show_results():
         st.subheader("Balance Sheet Evolution")
         
         if periods_data:
-            # Create DataFrame
-            df = pd.DataFrame(periods_data)
-            
             # Plot assets and liabilities
-            fig_data = pd.DataFrame({
-                'Period': df['period'],
-                'Total Assets': df['total_assets'],
-                'Total Liabilities': df['total_liabilities'],
-                'Equity': df['equity']
-            })
-            
-            st.line_chart(fig_data.set_index('Period'))
+            st.line_chart(balance_chart)
             
             # Show summary table
             st.markdown("**Key Balance Sheet Items (€M)**")
-            summary_df = df[['period', 'cash', 'hqla_total', 'total_assets', 'total_liabilities', 'equity']].copy()
-            summary_df.columns = ['Period', 'Cash', 'HQLA Total', 'Total Assets', 'Total Liabilities', 'Equity']
+            summary_df = df[_SUMMARY_COLS].rename(columns=_SUMMARY_RENAME)
             st.dataframe(summary_df, use_container_width=True)
         else:
             st.info("📊 No period-by-period balance sheet data available")
@@ -850,29 +1216,19 @@ def show_results():
         st.subheader("Liquidity Coverage Ratio & NSFR")
         
         if periods_data:
-            df = pd.DataFrame(periods_data)
-            
             # Plot LCR and NSFR
-            liquidity_df = pd.DataFrame({
-                'Period': df['period'],
-                'LCR (%)': df['lcr'],
-                'NSFR (%)': df['nsfr']
-            })
-            
-            st.line_chart(liquidity_df.set_index('Period'))
+            st.line_chart(liquidity_chart)
             
             # Add regulatory minimum lines info
             st.info("🎯 Regulatory Minimum: LCR ≥ 100%, NSFR ≥ 100%")
             
             # Show breaches
-            lcr_breaches = df[df['lcr'] < 100]
-            if not lcr_breaches.empty:
-                st.warning(f"⚠️ LCR falls below 100% in periods: {', '.join(map(str, lcr_breaches['period'].tolist()))}")
+            if lcr_breach_periods:
+                st.warning(f"⚠️ LCR falls below 100% in periods: {lcr_breach_periods}")
             
             # Table
             st.markdown("**Liquidity Metrics**")
-            liquidity_table = df[['period', 'lcr', 'nsfr', 'liquidity_buffer']].copy()
-            liquidity_table.columns = ['Period', 'LCR (%)', 'NSFR (%)', 'Liquidity Buffer (€M)']
+            liquidity_table = df[_LIQUIDITY_COLS].rename(columns=_LIQUIDITY_RENAME)
             st.dataframe(liquidity_table, use_container_width=True)
         else:
             st.info("📈 No liquidity metrics data available")
@@ -881,28 +1237,19 @@ def show_results():
         st.subheader("Capital Ratios")
         
         if periods_data:
-            df = pd.DataFrame(periods_data)
-            
             # Plot CET1
-            capital_df = pd.DataFrame({
-                'Period': df['period'],
-                'CET1 Ratio (%)': df['cet1_ratio']
-            })
-            
-            st.line_chart(capital_df.set_index('Period'))
+            st.line_chart(capital_chart)
             
             # Add regulatory minimum line info
             st.info("🎯 CET1 Minimum: 4.5%")
             
             # Show breaches
-            cet1_breaches = df[df['cet1_ratio'] < 4.5]
-            if not cet1_breaches.empty:
-                st.error(f"❌ CET1 falls below 4.5% in periods: {', '.join(map(str, cet1_breaches['period'].tolist()))}")
+            if cet1_breach_periods:
+                st.error(f"❌ CET1 falls below 4.5% in periods: {cet1_breach_periods}")
             
             # Table
             st.markdown("**Capital Ratios**")
-            capital_table = df[['period', 'cet1_ratio', 'equity']].copy()
-            capital_table.columns = ['Period', 'CET1 Ratio (%)', 'Total Equity (€M)']
+            capital_table = df[_CAPITAL_COLS].rename(columns=_CAPITAL_RENAME)
             st.dataframe(capital_table, use_container_width=True)
         else:
             st.info("📉 No capital ratio data available")
@@ -911,11 +1258,8 @@ def show_results():
         st.subheader("Detailed Period-by-Period Analysis")
         
         if periods_data:
-            df = pd.DataFrame(periods_data)
-            
-            # Format all columns nicely
-            display_df = df.copy()
-            display_df.columns = [c.replace('_', ' ').title() for c in display_df.columns]
+            # Format all columns nicely (cached per run like the base frame)
+            display_df = _display_df(results.get('simulation_timestamp', ''), df)
             
             st.dataframe(
                 display_df,
@@ -925,182 +1269,242 @@ def show_results():
             
             # Additional analysis
             st.markdown("### 📈 Key Insights")
-            
+
+            # Pull the first and last rows out once instead of paying a
+            # two-level iloc lookup per displayed figure
+            first = df.iloc[0].to_dict()
+            last = df.iloc[-1].to_dict()
+            asset_reduction = first['total_assets'] - last['total_assets']
+
             col1, col2 = st.columns(2)
-            
+
             with col1:
                 st.markdown("**Assets & Liabilities**")
-                st.write(f"- Starting Total Assets: €{df.iloc[0]['total_assets']:,.0f}M")
-                st.write(f"- Ending Total Assets: €{df.iloc[-1]['total_assets']:,.0f}M")
-                st.write(f"- Asset Reduction: €{df.iloc[0]['total_assets'] - df.iloc[-1]['total_assets']:,.0f}M ({((df.iloc[0]['total_assets'] - df.iloc[-1]['total_assets'])/df.iloc[0]['total_assets']*100):.1f}%)")
-            
+                st.write(f"- Starting Total Assets: €{first['total_assets']:,.0f}M")
+                st.write(f"- Ending Total Assets: €{last['total_assets']:,.0f}M")
+                st.write(f"- Asset Reduction: €{asset_reduction:,.0f}M ({asset_reduction / first['total_assets'] * 100:.1f}%)")
+
             with col2:
                 st.markdown("**Liquidity Position**")
-                st.write(f"- Starting LCR: {df.iloc[0]['lcr']:.1f}%")
-                st.write(f"- Ending LCR: {df.iloc[-1]['lcr']:.1f}%")
-                st.write(f"- Starting Cash: €{df.iloc[0]['cash']:,.0f}M")
-                st.write(f"- Ending Cash: €{df.iloc[-1]['cash']:,.0f}M")
+                st.write(f"- Starting LCR: {first['lcr']:.1f}%")
+                st.write(f"- Ending LCR: {last['lcr']:.1f}%")
+                st.write(f"- Starting Cash: €{first['cash']:,.0f}M")
+                st.write(f"- Ending Cash: €{last['cash']:,.0f}M")
         else:
             st.info("📋 No detailed analysis data available")
     
     # Export options
     st.markdown("---")
-    # Export options
-st.markdown("---")
-st.subheader("📥 Export Results")
+    st.subheader("📥 Export Results")
 
-periods_data = results.get('periods_data', [])
+    if not periods_data:
+        st.warning("⚠️ Cannot export - no period data available")
+    else:
+        # Cache key for the export builders: rebuilt only when a new
+        # simulation lands, not on every widget rerun
+        stamp = results.get('simulation_timestamp', '')
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        col1, col2, col3 = st.columns(3)
 
-if not periods_data:
-    st.warning("⚠️ Cannot export - no period data available")
-else:
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        # Excel export
-        try:
-            excel_buffer = create_excel_export(results, periods_data)
-            st.download_button(
-                label="📊 Download Excel Report",
-                data=excel_buffer,
-                file_name=f"simulation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
-            log_user_action("results_exported", {'format': 'excel'})
-        except Exception as e:
-            st.error(f"Excel export failed: {str(e)}")
-            logger.error(f"Excel export error: {str(e)}")
-    
-    with col2:
-        # CSV export
-        try:
-            csv_data = create_csv_export(periods_data)
-            st.download_button(
-                label="📋 Download CSV Data",
-                data=csv_data,
-                file_name=f"simulation_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-            log_user_action("results_exported", {'format': 'csv'})
-        except Exception as e:
-            st.error(f"CSV export failed: {str(e)}")
-            logger.error(f"CSV export error: {str(e)}")
-    
-    with col3:
-        # JSON export
-        try:
-            # ✅ FIX: Handle numpy types in JSON
-            def convert_types(obj):
-                """Convert numpy types to Python types"""
-                if isinstance(obj, np.integer):
-                    return int(obj)
-                elif isinstance(obj, np.floating):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif isinstance(obj, dict):
-                    return {k: convert_types(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_types(item) for item in obj]
-                return obj
-            
-            results_clean = convert_types(results)
-            json_data = json.dumps(results_clean, indent=2, default=str)
-            
-            st.download_button(
-                label="📄 Download JSON",
-                data=json_data,
-                file_name=f"simulation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                use_container_width=True
-            )
-            log_user_action("results_exported", {'format': 'json'})
-        except Exception as e:
-            st.error(f"JSON export failed: {str(e)}")
-            logger.error(f"JSON export error: {str(e)}")
+        with col1:
+            # Excel export
+            try:
+                excel_buffer = create_excel_export(stamp, results, periods_data)
+                st.download_button(
+                    label="📊 Download Excel Report",
+                    data=excel_buffer,
+                    file_name=f"simulation_results_{ts}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    use_container_width=True
+                )
+                log_user_action("results_exported", {'format': 'excel'})
+            except Exception as e:
+                st.error(f"Excel export failed: {str(e)}")
+                logger.error(f"Excel export error: {str(e)}")
 
+        with col2:
+            # CSV export
+            try:
+                csv_data = create_csv_export(stamp, periods_data)
+                st.download_button(
+                    label="📋 Download CSV Data",
+                    data=csv_data,
+                    file_name=f"simulation_data_{ts}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+                log_user_action("results_exported", {'format': 'csv'})
+            except Exception as e:
+                st.error(f"CSV export failed: {str(e)}")
+                logger.error(f"CSV export error: {str(e)}")
 
-    
-    
-def create_excel_export(results, periods_data):
-    """Create Excel file with multiple sheets"""
+        with col3:
+            # JSON export
+            try:
+                if orjson is not None:
+                    # orjson walks numpy scalars and arrays natively, so
+                    # no pre-conversion pass is needed
+                    json_data = orjson.dumps(
+                        results,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                        default=str
+                    ).decode('utf-8')
+                else:
+                    # ✅ FIX: Handle numpy types in JSON
+                    def convert_types(obj):
+                        """Convert numpy types to Python types"""
+                        if isinstance(obj, np.integer):
+                            return int(obj)
+                        elif isinstance(obj, np.floating):
+                            return float(obj)
+                        elif isinstance(obj, np.ndarray):
+                            return obj.tolist()
+                        elif isinstance(obj, dict):
+                            return {k: convert_types(v) for k, v in obj.items()}
+                        elif isinstance(obj, list):
+                            return [convert_types(item) for item in obj]
+                        return obj
+
+                    results_clean = convert_types(results)
+                    json_data = json.dumps(results_clean, indent=2, default=str)
+
+                st.download_button(
+                    label="📄 Download JSON",
+                    data=json_data,
+                    file_name=f"simulation_results_{ts}.json",
+                    mime="application/json",
+                    use_container_width=True
+                )
+                log_user_action("results_exported", {'format': 'json'})
+            except Exception as e:
+                st.error(f"JSON export failed: {str(e)}")
+                logger.error(f"JSON export error: {str(e)}")
+
+
+@st.cache_data(show_spinner=False)
+def create_excel_export(stamp: str, _results, _periods_data):
+    """Create Excel file with multiple sheets.
+
+    Cached per simulation run via stamp; the payload arguments are
+    underscore-prefixed so Streamlit does not hash them on rerun.
+    """
     import io
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    
-    wb = Workbook()
-    
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    # Write-only mode streams rows straight into the archive instead of
+    # building the whole cell grid in memory; sheets are append-only, so
+    # styled cells go through WriteOnlyCell
+    wb = Workbook(write_only=True)
+
     # Summary Sheet
-    ws_summary = wb.active
-    ws_summary.title = "Summary"
-    
+    ws_summary = wb.create_sheet("Summary")
+
+    # Style objects are immutable and shareable; one instance per style
+    # instead of one per cell
+    bold_font = Font(bold=True)
+
+    def _bold(value, font=bold_font):
+        cell = WriteOnlyCell(ws_summary, value=value)
+        cell.font = font
+        return cell
+
     # Header
-    ws_summary['A1'] = "Bank Liquidity Stress Test Results"
-    ws_summary['A1'].font = Font(bold=True, size=14)
-    
+    ws_summary.append([_bold("Bank Liquidity Stress Test Results", Font(bold=True, size=14))])
+    ws_summary.append([])
+
     # Key metrics
-    ws_summary['A3'] = "Key Metrics"
-    ws_summary['A3'].font = Font(bold=True)
-    
+    ws_summary.append([_bold("Key Metrics")])
+
     metrics = [
-        ["Scenario Name", results.get('scenario_name', 'N/A')],
-        ["Simulation Timestamp", results.get('simulation_timestamp', 'N/A')],
-        ["Time Granularity", results.get('time_granularity', 'N/A')],
-        ["Number of Periods", results.get('num_periods', 'N/A')],
-        ["Survival Horizon", f"{results.get('survival_horizon', 0)} periods"],
-        ["First Breach Type", results.get('breach_type', 'None')],
-        ["Final LCR (%)", f"{results.get('final_lcr', 0):.2f}"],
-        ["Final CET1 (%)", f"{results.get('final_cet1', 0):.2f}"],
-        ["Asset Depletion (€M)", f"{results.get('asset_depletion', 0):.2f}"],
-        ["Capital Erosion (%)", f"{results.get('capital_erosion', 0):.2f}"]
+        ["Scenario Name", _results.get('scenario_name', 'N/A')],
+        ["Simulation Timestamp", _results.get('simulation_timestamp', 'N/A')],
+        ["Time Granularity", _results.get('time_granularity', 'N/A')],
+        ["Number of Periods", _results.get('num_periods', 'N/A')],
+        ["Survival Horizon", f"{_results.get('survival_horizon', 0)} periods"],
+        ["First Breach Type", _results.get('breach_type', 'None')],
+        ["Final LCR (%)", f"{_results.get('final_lcr', 0):.2f}"],
+        ["Final CET1 (%)", f"{_results.get('final_cet1', 0):.2f}"],
+        ["Asset Depletion (€M)", f"{_results.get('asset_depletion', 0):.2f}"],
+        ["Capital Erosion (%)", f"{_results.get('capital_erosion', 0):.2f}"]
     ]
-    
-    for i, (label, value) in enumerate(metrics, start=4):
-        ws_summary[f'A{i}'] = label
-        ws_summary[f'B{i}'] = value
-        ws_summary[f'A{i}'].font = Font(bold=True)
-    
+
+    for label, value in metrics:
+        ws_summary.append([_bold(label), value])
+
     # Period Data Sheet
-    if periods_data:
+    if _periods_data:
         ws_data = wb.create_sheet("Period Data")
-        
+
         # Convert periods_data to DataFrame
-        df = pd.DataFrame(periods_data)
-        
+        df = pd.DataFrame(_periods_data)
+
         # Headers
-        for col_num, col_name in enumerate(df.columns, start=1):
-            cell = ws_data.cell(row=1, column=col_num)
-            cell.value = col_name.replace('_', ' ').title()
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-        
-        # Data
-        for row_num, row_data in enumerate(df.values, start=2):
-            for col_num, value in enumerate(row_data, start=1):
-                cell = ws_data.cell(row=row_num, column=col_num)
-                # Handle different data types
-                if isinstance(value, (int, float)):
-                    cell.value = float(value) if not np.isnan(value) else 0
-                else:
-                    cell.value = str(value)
-    
+        header_font = Font(color="FFFFFF", bold=True)
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header = []
+        for col_name in df.columns:
+            cell = WriteOnlyCell(ws_data, value=col_name.replace('_', ' ').title())
+            cell.fill = header_fill
+            cell.font = header_font
+            header.append(cell)
+        ws_data.append(header)
+
+        # Data. itertuples yields plain tuples without the object-dtype
+        # unification df.values would pay; np.integer is matched explicitly
+        # because it keeps the period column's int64 scalars (not a
+        # subclass of int, unlike np.float64/float)
+        for row_data in df.itertuples(index=False, name=None):
+            ws_data.append([
+                (float(value) if not np.isnan(value) else 0)
+                if isinstance(value, (int, float, np.integer)) else str(value)
+                for value in row_data
+            ])
+
     # Save to buffer
     buffer = io.BytesIO()
     wb.save(buffer)
     buffer.seek(0)
-    
+
     return buffer.getvalue()
 
 
 
 
-def create_csv_export(periods_data):
-    """Create CSV export of period data"""
-    df = pd.DataFrame(periods_data)
-    return df.to_csv(index=False)
+@st.cache_data(show_spinner=False)
+def create_csv_export(stamp: str, _periods_data):
+    """Create CSV export of period data.
+
+    Cached per simulation run via stamp, like create_excel_export. Goes
+    through Arrow's C++ CSV writer when pyarrow is installed.
+    """
+    df = pd.DataFrame(_periods_data)
+
+    if _HAS_PYARROW:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+
+        buf = pa.BufferOutputStream()
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+        return buf.getvalue().to_pybytes()
+
+    # to_csv into a buffer with an explicit line terminator skips the
+    # per-platform newline translation of the string-returning path
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, lineterminator='\n')
+    return buf.getvalue()
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _default_haircuts() -> pd.DataFrame:
+    """Default liquidation haircut table, built once per process"""
+    return pd.DataFrame({
+        'Asset Class': ['HQLA Level 1', 'HQLA Level 2A', 'HQLA Level 2B',
+                        'Other Securities', 'Performing Loans', 'Real Estate'],
+        'Base Haircut %': [0, 5, 15, 25, 30, 40],
+        'Fire-sale Penalty %': [2, 5, 10, 15, 20, 25],
+        'Max Daily Sale €M': [1000, 500, 300, 200, 100, 50]
+    })
 
 def show_configuration():
     """Configuration Page"""
@@ -1110,36 +1514,40 @@ def show_configuration():
     
     with tab1:
         st.subheader("Basel III Regulatory Parameters")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**LCR Parameters**")
-            st.number_input("HQLA Level 1 Haircut %", 0, 100, 0)
-            st.number_input("HQLA Level 2A Haircut %", 0, 100, 15)
-            st.number_input("HQLA Level 2B Haircut %", 0, 100, 50)
-            st.number_input("Level 2 Asset Cap %", 0, 100, 40)
-        
-        with col2:
-            st.markdown("**Capital Requirements**")
-            st.number_input("CET1 Minimum %", 0.0, 20.0, 4.5, step=0.1)
-            st.number_input("Tier 1 Minimum %", 0.0, 20.0, 6.0, step=0.1)
-            st.number_input("Total Capital Minimum %", 0.0, 20.0, 8.0, step=0.1)
-            st.number_input("Capital Conservation Buffer %", 0.0, 10.0, 2.5, step=0.1)
+
+        # Inside a form the eight inputs no longer trigger a script
+        # rerun per edit; changes are batched into the single submit
+        with st.form("basel_params"):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown("**LCR Parameters**")
+                st.number_input("HQLA Level 1 Haircut %", 0, 100, 0)
+                st.number_input("HQLA Level 2A Haircut %", 0, 100, 15)
+                st.number_input("HQLA Level 2B Haircut %", 0, 100, 50)
+                st.number_input("Level 2 Asset Cap %", 0, 100, 40)
+
+            with col2:
+                st.markdown("**Capital Requirements**")
+                st.number_input("CET1 Minimum %", 0.0, 20.0, 4.5, step=0.1)
+                st.number_input("Tier 1 Minimum %", 0.0, 20.0, 6.0, step=0.1)
+                st.number_input("Total Capital Minimum %", 0.0, 20.0, 8.0, step=0.1)
+                st.number_input("Capital Conservation Buffer %", 0.0, 10.0, 2.5, step=0.1)
+
+            if st.form_submit_button("💾 Save Regulatory Parameters"):
+                st.success("✅ Regulatory parameters saved!")
+                log_user_action("config_updated", {'type': 'regulatory'})
     
     with tab2:
         st.subheader("Asset Liquidation Haircuts")
         
         st.markdown("Configure haircuts applied during asset liquidation")
         
-        haircuts_df = pd.DataFrame({
-            'Asset Class': ['HQLA Level 1', 'HQLA Level 2A', 'HQLA Level 2B',
-                           'Other Securities', 'Performing Loans', 'Real Estate'],
-            'Base Haircut %': [0, 5, 15, 25, 30, 40],
-            'Fire-sale Penalty %': [2, 5, 10, 15, 20, 25],
-            'Max Daily Sale €M': [1000, 500, 300, 200, 100, 50]
-        })
-        
+        # Cached, so the rebuild cost is not paid on every rerun
+        # (st.cache_data hands back a fresh copy for the editor)
+        haircuts_df = _default_haircuts()
+
+
         edited_haircuts = st.data_editor(
             haircuts_df,
             use_container_width=True,
@@ -1175,50 +1583,146 @@ def show_configuration():
             st.success("✅ System configuration saved!")
             log_user_action("config_updated", {'type': 'system'})
 
+# Rows rendered per block in _audit_csv; bounds the transient string
+# and tuple built for the %-format to ~chunk size instead of the whole log
+_CSV_CHUNK_ROWS = 65536
+
+def _audit_csv(audit_df: pd.DataFrame) -> bytes:
+    """
+    Build the audit-log CSV without pandas' generic row writer.
+
+    The schema is fixed and only the details field needs quoting (it is
+    pre-quoted below), so each block of rows is stacked, flattened and
+    rendered with a single %-format instead of per-cell dispatch.
+    Rendering in chunks into a BytesIO keeps peak memory proportional
+    to the chunk, not the log.
+    """
+    buf = io.BytesIO()
+    buf.write(b"timestamp,action,session_id,details\n")
+    for i in range(0, len(audit_df), _CSV_CHUNK_ROWS):
+        sub = audit_df.iloc[i:i + _CSV_CHUNK_ROWS]
+        arr = np.column_stack([
+            sub['timestamp'].astype(str).to_numpy(),
+            sub['action'].astype(str).to_numpy(),
+            sub['session_id'].to_numpy(),
+            np.array(
+                ['"%s"' % str(d).replace('"', '""') if d else '""'
+                 for d in sub['details']],
+                dtype=object
+            )
+        ])
+        buf.write((("%s,%s,%s,%s\n" * len(sub)) % tuple(arr.ravel())).encode())
+    return buf.getvalue()
+
+def _audit_frame(log: dict) -> pd.DataFrame:
+    """
+    Materialize the columnar audit buffer into a display DataFrame.
+
+    The int64 timestamps are copied once and reinterpreted straight to
+    datetime64[ns] (no parsing, so DatetimeColumn formatting stays a
+    C-level strftime) and categorical actions collapse repeated strings
+    to integer codes.
+
+    Every column must own its data: the frame is cached in session
+    state for the rest of the session, and a zero-copy view over the
+    live array('q') would export its buffer and make every later
+    log['ts_ns'].append() raise BufferError, anywhere in the app.
+    """
+    return pd.DataFrame({
+        'timestamp': np.array(log['ts_ns'], dtype=np.int64).view('M8[ns]'),
+        'session_id': log['session_id'],
+        'action': pd.Categorical(log['action']),
+        'details': log['details']
+    }, copy=False)
+
 def show_audit_log():
     """Audit Log Page"""
     st.header("📋 Audit Log & Session History")
-    
-    if not st.session_state.audit_log:
+
+    log = st.session_state.audit_log
+    if not log['action']:
         st.info("ℹ️ No audit log entries yet.")
         return
-    
-    # Convert to DataFrame
-    audit_df = pd.DataFrame(st.session_state.audit_log)
-    
+
+    # The frame is memoized per session and rebuilt only when entries
+    # were appended (or trimmed) since the last render
+    key = (len(log['action']), log['ts_ns'][-1])
+    cached = st.session_state.get('_audit_df_cache')
+    if cached is None or cached[0] != key:
+        audit_df = _audit_frame(log)
+        st.session_state._audit_df_cache = (key, audit_df)
+    else:
+        audit_df = cached[1]
+
     # Filters
     col1, col2 = st.columns(2)
     
     with col1:
+        # The per-action row index already knows every distinct action,
+        # so the options list needs no O(N) unique() pass per rerun
         action_filter = st.multiselect(
             "Filter by Action",
-            audit_df['action'].unique().tolist()
+            list(st.session_state.action_index)
         )
     
     with col2:
+        today = datetime.now().date()
         date_range = st.date_input(
             "Date Range",
-            value=(datetime.now().date(), datetime.now().date())
+            value=(today, today)
         )
     
-    # Apply filters
+    # Apply filters: gather the pre-indexed rows for the selected
+    # actions rather than building a boolean mask over every entry
     if action_filter:
-        audit_df = audit_df[audit_df['action'].isin(action_filter)]
-    
-    # Display
-    st.dataframe(
-        audit_df,
-        use_container_width=True,
-        column_config={
-            'timestamp': st.column_config.DatetimeColumn('Timestamp', format="DD/MM/YYYY HH:mm:ss"),
-            'action': st.column_config.TextColumn('Action'),
-            'session_id': st.column_config.TextColumn('Session ID')
-        }
-    )
+        index = st.session_state.action_index
+        rows = np.fromiter(
+            chain.from_iterable(index[a] for a in action_filter),
+            dtype=np.int64
+        )
+        rows.sort()  # keep chronological order for the date slice below
+        audit_df = audit_df.take(rows)
+
+    # Entries are appended in time order, so the timestamp column is
+    # already sorted: the date range is two binary searches and a slice
+    # rather than a full boolean-mask scan
+    if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+        ts = audit_df['timestamp'].to_numpy()
+        i0 = ts.searchsorted(np.datetime64(date_range[0]))
+        i1 = ts.searchsorted(
+            np.datetime64(date_range[1]) + np.timedelta64(1, 'D'), side='left'
+        )
+        audit_df = audit_df.iloc[i0:i1]
+
+    # Display: prefer the aggrid component when installed - it paginates
+    # and sorts/filters in the browser instead of re-slicing the frame
+    # in Python on every interaction
+    if _HAS_AGGRID:
+        from st_aggrid import AgGrid, GridOptionsBuilder
+
+        gb = GridOptionsBuilder.from_dataframe(audit_df)
+        gb.configure_pagination()
+        gb.configure_default_column(filter=True, sortable=True)
+        AgGrid(audit_df, gridOptions=gb.build())
+    else:
+        # Fixed dimensions: with use_container_width the table re-lays
+        # out (and re-serializes) on every browser resize event
+        st.dataframe(
+            audit_df,
+            height=600,
+            width=1200,
+            column_config=_AUDIT_COLCFG
+        )
     
     # Export
     if st.button("📥 Export Audit Log"):
-        csv = audit_df.to_csv(index=False)
+        if len(audit_df) == len(log['action']):
+            # No filter in effect: hand over the byte buffer maintained
+            # at append time instead of re-serializing the frame
+            csv = (b"timestamp,action,session_id,details\n"
+                   + bytes(st.session_state.audit_csv_bytes))
+        else:
+            csv = _audit_csv(audit_df)
         st.download_button(
             "Download CSV",
             csv,
@@ -1227,6 +1731,37 @@ def show_audit_log():
         )
         log_user_action("audit_log_exported")
 
+    # Columnar export when pyarrow is installed: snappy-compressed
+    # Parquet writes far faster than CSV and keeps the dtypes intact
+    if _HAS_PYARROW and st.button("📥 Export Audit Log (Parquet)"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        buf = io.BytesIO()
+        pq.write_table(
+            pa.Table.from_pandas(audit_df.astype({'details': str})),
+            buf,
+            compression='snappy'
+        )
+        st.download_button(
+            "Download Parquet",
+            buf.getvalue(),
+            "audit_log.parquet",
+            "application/octet-stream"
+        )
+        log_user_action("audit_log_exported", {'format': 'parquet'})
+
+# Page dispatch table; keys match the _PAGES tuple behind the sidebar
+# radio, so routing is one dict lookup instead of six string compares
+_ROUTES = {
+    "📊 Balance Sheet Setup": show_balance_sheet_setup,
+    "📉 Stress Scenarios": show_stress_scenarios,
+    "🔄 Run Simulation": show_simulation,
+    "📈 Results & Analytics": show_results,
+    "⚙️ Configuration": show_configuration,
+    "📋 Audit Log": show_audit_log,
+}
+
 if __name__ == "__main__":
     try:
         main()
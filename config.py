@@ -5,6 +5,7 @@ Centralized configuration for the Bank Liquidity Simulator
 
 import os
 from pathlib import Path
+from types import MappingProxyType
 
 # Application Info
 APP_NAME = "Bank Recovery Planning & Liquidity Stress Simulator"
@@ -18,10 +19,18 @@ LOGS_DIR = BASE_DIR / "logs"
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_DIR = BASE_DIR / "outputs"
 
-# Create directories
-LOGS_DIR.mkdir(exist_ok=True)
-DATA_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
+
+def ensure_dirs():
+    """
+    Create the log/data/output directories
+
+    Called once from the app entrypoint instead of at import time, so
+    that importing this module (tests, doc tooling, worker processes)
+    has no filesystem side effects.
+    """
+    LOGS_DIR.mkdir(exist_ok=True)
+    DATA_DIR.mkdir(exist_ok=True)
+    OUTPUT_DIR.mkdir(exist_ok=True)
 
 # Security Settings
 SECURITY = {
@@ -104,7 +113,7 @@ SIMULATION = {
     'DEFAULT_TIME_GRANULARITY': 'Daily',
     'DEFAULT_PERIODS': 30,
     'MAX_PERIODS': 365,
-    'DEFAULT_LIQUIDATION_ORDER': [
+    'DEFAULT_LIQUIDATION_ORDER': (
         'Cash',
         'HQLA Level 1',
         'HQLA Level 2A',
@@ -112,7 +121,7 @@ SIMULATION = {
         'Other Securities',
         'Performing Loans',
         'Real Estate'
-    ],
+    ),
 }
 
 # UI Settings
@@ -188,15 +197,23 @@ ALERTS = {
     'LIQUIDITY_WARNING': 0.1,  # Ratio - liquid assets / total assets
 }
 
-# Environment-specific overrides
+# Environment name, read once at import
 ENV = os.getenv('APP_ENV', 'development')
 
-if ENV == 'production':
-    LOGGING['LEVEL'] = 'WARNING'
-    SECURITY['SESSION_TIMEOUT_MINUTES'] = 30
-elif ENV == 'testing':
-    LOGGING['LEVEL'] = 'DEBUG'
-    SECURITY['MAX_FILE_SIZE_MB'] = 5
+
+def _apply_env_overrides():
+    """
+    Apply environment-specific overrides to the mutable settings
+
+    Called once from the app entrypoint alongside ensure_dirs(), rather
+    than mutating LOGGING/SECURITY as an import side effect.
+    """
+    if ENV == 'production':
+        LOGGING['LEVEL'] = 'WARNING'
+        SECURITY['SESSION_TIMEOUT_MINUTES'] = 30
+    elif ENV == 'testing':
+        LOGGING['LEVEL'] = 'DEBUG'
+        SECURITY['MAX_FILE_SIZE_MB'] = 5
 
 # Feature Flags
 FEATURES = {
@@ -246,6 +263,20 @@ HELP_TEXT = {
     """,
 }
 
+# Freeze static parameter tables as read-only views so shared references
+# cannot be mutated at runtime. LOGGING, SECURITY and FEATURES stay plain
+# dicts because the environment overrides above (and tests) write to them.
+REGULATORY = MappingProxyType(REGULATORY)
+HAIRCUTS = MappingProxyType(HAIRCUTS)
+FIRE_SALE = MappingProxyType(FIRE_SALE)
+BASEL_RUNOFF_RATES = MappingProxyType(BASEL_RUNOFF_RATES)
+RWA_WEIGHTS = MappingProxyType(RWA_WEIGHTS)
+SIMULATION = MappingProxyType(SIMULATION)
+UI = MappingProxyType(UI)
+VALIDATION = MappingProxyType(VALIDATION)
+EXPORT = MappingProxyType(EXPORT)
+ALERTS = MappingProxyType(ALERTS)
+
 # Tooltips
 TOOLTIPS = {
     'lcr': 'Liquidity Coverage Ratio: HQLA / 30-day net outflows. Minimum 100% required.',
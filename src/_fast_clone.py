@@ -0,0 +1,24 @@
+"""
+Fast Clone Helper
+Lightweight cloning for balance-sheet data dicts
+"""
+
+from typing import Dict
+
+
+def clone_bs_data(data: Dict) -> Dict:
+    """
+    Clone a balance-sheet data dict
+
+    The structure is exactly {str: {str: float}}, so a two-level dict
+    clone produces an isolated copy without deepcopy's type-dispatch and
+    memo overhead. Shared by BalanceSheet.copy and any engine path that
+    needs an independent copy of the raw data.
+
+    Args:
+        data: Balance sheet data ({'assets': {...}, 'liabilities': {...}, ...})
+
+    Returns:
+        Dict: Independent copy safe to mutate
+    """
+    return {k: dict(v) for k, v in data.items()}
@@ -7,10 +7,84 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
+from enum import IntEnum
 import logging
 
+from src._fast_clone import clone_bs_data
+
 logger = logging.getLogger(__name__)
 
+# Canonical item order used to pack the balance sheet into a contiguous
+# float64 vector (structure-of-arrays layout)
+ASSET_KEYS = (
+    'cash_reserves', 'hqla_level1', 'hqla_level2a', 'hqla_level2b',
+    'performing_loans', 'npl', 'real_estate', 'other_securities', 'other_assets'
+)
+LIAB_KEYS = (
+    'retail_stable', 'retail_unstable', 'corporate_deposits',
+    'wholesale_funding', 'secured_funding', 'other_liabilities'
+)
+EQUITY_KEYS = ('cet1', 'at1', 'tier2')
+
+# Integer identities for the packed columns, derived from the key
+# tuples so they can never drift out of alignment. Hot paths index
+# arrays with these instead of hashing string keys.
+AssetId = IntEnum('AssetId', {k: i for i, k in enumerate(ASSET_KEYS)})
+LiabId = IntEnum('LiabId', {k: i for i, k in enumerate(LIAB_KEYS)})
+
+# Per-asset weight vectors aligned with ASSET_KEYS, so the weighted
+# aggregates below reduce to a single dot product over the packed vector.
+# RWA weights: cash and HQLA 0%, performing loans 100%, NPL 150%,
+# real estate 100%, other securities 50%, other assets 100%
+RWA_WEIGHTS_VEC = np.array([0.0, 0.0, 0.0, 0.0, 1.0, 1.5, 1.0, 0.5, 1.0])
+# HQLA selectors: Level 1 / 2A / 2B, without and with Basel III LCR
+# haircuts (0% / 15% / 50%)
+HQLA_MASK_VEC = np.array([0.0, 1.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+HQLA_HAIRCUT_VEC = np.array([0.0, 1.00, 0.85, 0.50, 0.0, 0.0, 0.0, 0.0, 0.0])
+
+_ASSET_SLICE = slice(0, len(ASSET_KEYS))
+_LIAB_SLICE = slice(len(ASSET_KEYS), len(ASSET_KEYS) + len(LIAB_KEYS))
+_SECTION_STARTS = (0, len(ASSET_KEYS), len(ASSET_KEYS) + len(LIAB_KEYS))
+_EQUITY_SLICE = slice(len(ASSET_KEYS) + len(LIAB_KEYS),
+                      len(ASSET_KEYS) + len(LIAB_KEYS) + len(EQUITY_KEYS))
+
+
+@dataclass(slots=True, frozen=True)
+class BalanceSheetInput:
+    """
+    Flat, immutable capture of the manual balance-sheet entry fields.
+
+    slots=True avoids a per-instance __dict__ and frozen=True makes the
+    object hashable, so it can be used directly as a cache key.
+    """
+
+    cash_reserves: float = 0.0
+    hqla_level1: float = 0.0
+    hqla_level2a: float = 0.0
+    hqla_level2b: float = 0.0
+    performing_loans: float = 0.0
+    npl: float = 0.0
+    real_estate: float = 0.0
+    other_securities: float = 0.0
+    other_assets: float = 0.0
+    retail_stable: float = 0.0
+    retail_unstable: float = 0.0
+    corporate_deposits: float = 0.0
+    wholesale_funding: float = 0.0
+    secured_funding: float = 0.0
+    other_liabilities: float = 0.0
+    cet1: float = 0.0
+    at1: float = 0.0
+    tier2: float = 0.0
+
+    def to_data(self) -> Dict:
+        """Expand into the nested dict structure BalanceSheet expects"""
+        return {
+            'assets': {k: getattr(self, k) for k in ASSET_KEYS},
+            'liabilities': {k: getattr(self, k) for k in LIAB_KEYS},
+            'equity': {k: getattr(self, k) for k in EQUITY_KEYS}
+        }
+
 
 @dataclass
 class BalanceSheet:
@@ -27,7 +101,56 @@ class BalanceSheet:
         self._assets_df = None
         self._liabilities_df = None
         self._validate_structure()
-    
+        self._rebuild_vec()
+
+    def _rebuild_vec(self):
+        """Pack the balance sheet into one contiguous float64 vector"""
+        assets = self.data['assets']
+        liabilities = self.data['liabilities']
+        equity = self.data['equity']
+        values = (
+            [assets.get(k, 0.0) for k in ASSET_KEYS] +
+            [liabilities.get(k, 0.0) for k in LIAB_KEYS] +
+            [equity.get(k, 0.0) for k in EQUITY_KEYS]
+        )
+        self._vec = np.array(values, dtype=np.float64)
+        # Every mutation funnels through here, so this doubles as the
+        # invalidation point for the memoized aggregates below
+        self._cache = {}
+
+    def _memo(self, key: str, compute) -> float:
+        """
+        Return a cached aggregate, computing it on first access.
+
+        _rebuild_vec clears the cache, so entries stay valid exactly
+        until the next mutation. The metrics path reads the same handful
+        of totals 6-8 times per simulation period.
+        """
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+    def _totals(self) -> tuple:
+        """
+        Return (total_assets, total_liabilities, total_equity) in one pass.
+
+        Callers that need several totals back-to-back (validate,
+        leverage_ratio, __repr__) would otherwise trigger three separate
+        slice reductions on a cold cache; reduceat sums all three
+        sections of the packed vector in a single sweep and seeds the
+        memo entries for the individual accessors.
+        """
+        cache = self._cache
+        if not ('total_assets' in cache and 'total_liabilities' in cache
+                and 'total_equity' in cache):
+            sums = np.add.reduceat(self._vec, _SECTION_STARTS)
+            cache['total_assets'] = float(sums[0])
+            cache['total_liabilities'] = float(sums[1])
+            cache['total_equity'] = float(sums[2])
+        return (cache['total_assets'], cache['total_liabilities'],
+                cache['total_equity'])
+
     def _validate_structure(self):
         """Validate that required fields exist"""
         required_keys = ['assets', 'liabilities', 'equity']
@@ -35,6 +158,11 @@ class BalanceSheet:
             if key not in self.data:
                 raise ValueError(f"Missing required key: {key}")
     
+    @classmethod
+    def from_input(cls, bs_input: BalanceSheetInput) -> 'BalanceSheet':
+        """Create a balance sheet from a flat BalanceSheetInput"""
+        return cls(bs_input.to_data())
+
     def validate(self) -> bool:
         """
         Validate balance sheet integrity
@@ -50,9 +178,7 @@ class BalanceSheet:
                         raise ValueError(f"Negative value not allowed: {category}.{key} = {value}")
             
             # Check balance equation (with tolerance for floating point)
-            total_assets = self.total_assets()
-            total_liabilities = self.total_liabilities()
-            total_equity = self.total_equity()
+            total_assets, total_liabilities, total_equity = self._totals()
             
             balance_diff = abs(total_assets - (total_liabilities + total_equity))
             tolerance = 0.01  # €10,000 tolerance
@@ -76,15 +202,18 @@ class BalanceSheet:
     
     def total_assets(self) -> float:
         """Calculate total assets"""
-        return sum(self.data['assets'].values())
-    
+        return self._memo('total_assets',
+                          lambda: float(self._vec[_ASSET_SLICE].sum()))
+
     def total_liabilities(self) -> float:
         """Calculate total liabilities"""
-        return sum(self.data['liabilities'].values())
-    
+        return self._memo('total_liabilities',
+                          lambda: float(self._vec[_LIAB_SLICE].sum()))
+
     def total_equity(self) -> float:
         """Calculate total equity"""
-        return sum(self.data['equity'].values())
+        return self._memo('total_equity',
+                          lambda: float(self._vec[_EQUITY_SLICE].sum()))
     
     def total_hqla(self, apply_haircuts: bool = False) -> float:
         """
@@ -96,17 +225,9 @@ class BalanceSheet:
         Returns:
             float: Total HQLA value
         """
-        hqla_level1 = self.data['assets'].get('hqla_level1', 0)
-        hqla_level2a = self.data['assets'].get('hqla_level2a', 0)
-        hqla_level2b = self.data['assets'].get('hqla_level2b', 0)
-        
-        if apply_haircuts:
-            # Basel III LCR haircuts
-            hqla_level1 *= 1.00  # No haircut
-            hqla_level2a *= 0.85  # 15% haircut
-            hqla_level2b *= 0.50  # 50% haircut
-        
-        return hqla_level1 + hqla_level2a + hqla_level2b
+        weights = HQLA_HAIRCUT_VEC if apply_haircuts else HQLA_MASK_VEC
+        return self._memo('total_hqla_weighted' if apply_haircuts else 'total_hqla',
+                          lambda: float(self._vec[_ASSET_SLICE] @ weights))
     
     def total_deposits(self) -> float:
         """Calculate total deposits"""
@@ -147,54 +268,48 @@ class BalanceSheet:
         - Real estate: 100%
         - Other securities: 50%
         """
-        rwa = 0
-        
-        # Cash and HQLA - 0% weight
-        # Performing loans - 100% weight
-        rwa += self.data['assets'].get('performing_loans', 0) * 1.0
-        
-        # NPL - 150% weight
-        rwa += self.data['assets'].get('npl', 0) * 1.5
-        
-        # Real estate - 100% weight
-        rwa += self.data['assets'].get('real_estate', 0) * 1.0
-        
-        # Other securities - 50% weight
-        rwa += self.data['assets'].get('other_securities', 0) * 0.5
-        
-        # Other assets - 100% weight
-        rwa += self.data['assets'].get('other_assets', 0) * 1.0
-        
-        return rwa
+        return self._memo('rwa_estimate',
+                          lambda: float(self._vec[_ASSET_SLICE] @ RWA_WEIGHTS_VEC))
     
-    def cet1_ratio(self) -> float:
-        """Calculate CET1 ratio as percentage"""
+    def capital_ratios(self) -> tuple:
+        """
+        Calculate (CET1, Tier 1, total capital) ratios as percentages
+
+        One RWA estimate feeds all three ratios; callers that need
+        several of them per period (the metrics path) should use this
+        instead of the individual accessors below.
+
+        Returns:
+            tuple: (cet1_ratio, tier1_ratio, total_capital_ratio)
+        """
         rwa = self.rwa_estimate()
         if rwa == 0:
-            return 0
-        cet1 = self.data['equity'].get('cet1', 0)
-        return (cet1 / rwa) * 100
-    
+            return (0, 0, 0)
+        equity = self.data['equity']
+        cet1 = equity.get('cet1', 0)
+        tier1 = cet1 + equity.get('at1', 0)
+        return ((cet1 / rwa) * 100,
+                (tier1 / rwa) * 100,
+                (self.total_capital() / rwa) * 100)
+
+    def cet1_ratio(self) -> float:
+        """Calculate CET1 ratio as percentage"""
+        return self.capital_ratios()[0]
+
     def tier1_ratio(self) -> float:
         """Calculate Tier 1 ratio as percentage"""
-        rwa = self.rwa_estimate()
-        if rwa == 0:
-            return 0
-        return (self.tier1_capital() / rwa) * 100
-    
+        return self.capital_ratios()[1]
+
     def total_capital_ratio(self) -> float:
         """Calculate total capital ratio as percentage"""
-        rwa = self.rwa_estimate()
-        if rwa == 0:
-            return 0
-        return (self.total_capital() / rwa) * 100
+        return self.capital_ratios()[2]
     
     def leverage_ratio(self) -> float:
         """Calculate simple leverage ratio (Equity / Assets)"""
-        assets = self.total_assets()
+        assets, _, equity = self._totals()
         if assets == 0:
             return 0
-        return (self.total_equity() / assets) * 100
+        return (equity / assets) * 100
 
     def apply_withdrawal(self, deposit_type: str, amount: float) -> float:
         """
@@ -215,7 +330,8 @@ class BalanceSheet:
         
         # Reduce liability
         self.data['liabilities'][deposit_type] -= withdrawal
-        
+        self._rebuild_vec()
+
         # ✅ FIX: Also reduce cash (this maintains balance sheet equation)
         # The cash reduction will be handled by liquidation in the engine
         # So we just track the outflow here
@@ -254,7 +370,8 @@ class BalanceSheet:
         
         # Record loss in equity
         self.data['equity']['cet1'] -= loss
-        
+        self._rebuild_vec()
+
         logger.debug(
             f"Asset liquidated: {asset_type} = {liquidated:.2f}M, "
             f"Haircut={haircut:.1f}%, Proceeds={proceeds:.2f}M, Loss={loss:.2f}M"
@@ -275,58 +392,57 @@ class BalanceSheet:
         Returns:
             pd.DataFrame: Balance sheet in tabular format
         """
-        data = []
-        
+        # Built as four parallel column lists rather than a list of row
+        # dicts, so pandas receives ready-made columns and skips the
+        # per-column dtype inference over row records
+        categories = []
+        items = []
+        amounts = []
+        percentages = []
+
+        # All percentages are relative to total assets; sum it once
+        # instead of twice per row inside the loops
+        total = self.total_assets()
+
+        def add_row(category: str, item: str, amount: float, percentage: float):
+            categories.append(category)
+            items.append(item)
+            amounts.append(amount)
+            percentages.append(percentage)
+
+        def pct(value: float) -> float:
+            return (value / total * 100) if total > 0 else 0
+
         # Assets
         for key, value in self.data['assets'].items():
-            data.append({
-                'Category': 'Assets',
-                'Item': key.replace('_', ' ').title(),
-                'Amount_M_EUR': value,
-                'Percentage': (value / self.total_assets() * 100) if self.total_assets() > 0 else 0
-            })
-        
+            add_row('Assets', key.replace('_', ' ').title(), value, pct(value))
+
         # Add total assets
-        data.append({
-            'Category': 'Assets',
-            'Item': 'TOTAL ASSETS',
-            'Amount_M_EUR': self.total_assets(),
-            'Percentage': 100.0
-        })
-        
+        add_row('Assets', 'TOTAL ASSETS', total, 100.0)
+
         # Liabilities
         for key, value in self.data['liabilities'].items():
-            data.append({
-                'Category': 'Liabilities',
-                'Item': key.replace('_', ' ').title(),
-                'Amount_M_EUR': value,
-                'Percentage': (value / self.total_assets() * 100) if self.total_assets() > 0 else 0
-            })
-        
+            add_row('Liabilities', key.replace('_', ' ').title(), value, pct(value))
+
         # Equity
         for key, value in self.data['equity'].items():
-            data.append({
-                'Category': 'Equity',
-                'Item': key.upper(),
-                'Amount_M_EUR': value,
-                'Percentage': (value / self.total_assets() * 100) if self.total_assets() > 0 else 0
-            })
-        
+            add_row('Equity', key.upper(), value, pct(value))
+
         # Add total liabilities + equity
-        data.append({
-            'Category': 'Liabilities + Equity',
-            'Item': 'TOTAL LIABILITIES + EQUITY',
-            'Amount_M_EUR': self.total_liabilities() + self.total_equity(),
-            'Percentage': 100.0
+        add_row('Liabilities + Equity', 'TOTAL LIABILITIES + EQUITY',
+                self.total_liabilities() + self.total_equity(), 100.0)
+
+        return pd.DataFrame({
+            'Category': categories,
+            'Item': items,
+            'Amount_M_EUR': amounts,
+            'Percentage': percentages
         })
-        
-        return pd.DataFrame(data)
     
     def copy(self):
         """Create a deep copy of the balance sheet"""
-        import copy
         return BalanceSheet(
-            data=copy.deepcopy(self.data),
+            data=clone_bs_data(self.data),
             period=self.period,
             timestamp=self.timestamp
         )
@@ -347,7 +463,8 @@ class BalanceSheet:
         }
     
     def __repr__(self):
-        return (f"BalanceSheet(Assets={self.total_assets():.2f}M, "
-                f"Liabilities={self.total_liabilities():.2f}M, "
-                f"Equity={self.total_equity():.2f}M, "
+        assets, liabilities, equity = self._totals()
+        return (f"BalanceSheet(Assets={assets:.2f}M, "
+                f"Liabilities={liabilities:.2f}M, "
+                f"Equity={equity:.2f}M, "
                 f"Period={self.period})")
@@ -7,10 +7,38 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Callable
 import logging
-from copy import deepcopy
+
+from src.balance_sheet import ASSET_KEYS, AssetId
 
 logger = logging.getLogger(__name__)
 
+# Display-name to balance-sheet key mapping for the liquidation order
+ASSET_MAPPING = {
+    'Cash': 'cash_reserves',
+    'HQLA Level 1': 'hqla_level1',
+    'HQLA Level 2A': 'hqla_level2a',
+    'HQLA Level 2B': 'hqla_level2b',
+    'Other Securities': 'other_securities',
+    'Performing Loans': 'performing_loans',
+    'Real Estate': 'real_estate'
+}
+
+# Base liquidation haircuts (%); the scenario's fire-sale premium is
+# added for everything except cash and Level 1 HQLA
+BASE_HAIRCUTS = {
+    'cash_reserves': 0,
+    'hqla_level1': 0,
+    'hqla_level2a': 5,
+    'hqla_level2b': 15,
+    'other_securities': 25,
+    'performing_loans': 30,
+    'real_estate': 40
+}
+# Same table indexed by AssetId for array-style dispatch (unlisted
+# assets fall back to 20%)
+HAIRCUT_BY_ID = tuple(BASE_HAIRCUTS.get(k, 20) for k in ASSET_KEYS)
+_NO_FIRE_SALE_IDS = frozenset((AssetId.cash_reserves, AssetId.hqla_level1))
+
 
 class LiquidityEngine:
     """
@@ -42,6 +70,20 @@ class LiquidityEngine:
         self.period_results = []
         self.current_period = 0
 
+        # Snapshots reconstructed on demand, keyed by period; only the
+        # handful of periods actually inspected (typically the breach
+        # period) ever get materialized
+        self._snapshot_cache = {}
+
+        # Liquidation order resolved once to (asset_type, haircut) pairs
+        # so the per-period loop skips the name mapping and haircut
+        # lookups; cash is excluded because it is consumed first
+        self._liquidation_plan = [
+            (asset_type, self._get_liquidation_haircut(asset_type, 0.0))
+            for asset_type in (ASSET_MAPPING.get(n) for n in liquidation_order)
+            if asset_type and asset_type != 'cash_reserves'
+        ]
+
     def run_simulation(
         self,
         progress_callback: Optional[Callable] = None) -> Dict:
@@ -88,11 +130,138 @@ class LiquidityEngine:
         
         return results
 
+    def run_batch(
+        self,
+        n_paths: int,
+        runoff_noise: float = 0.1,
+        seed: Optional[int] = None) -> Dict:
+        """
+        Run a vectorized Monte Carlo batch of the simulation
+
+        State is held as (n_paths, n_items) float64 matrices, so each
+        period costs a handful of broadcast operations nearly independent
+        of the number of paths - the per-path Python loop of
+        run_simulation does not scale to thousands of paths. Paths
+        diverge by scaling the scenario's runoff rates with a per-path
+        factor drawn from a normal around 1; withdrawals, cash-first
+        liquidation, haircuts and the periodic credit deterioration
+        mirror the scalar engine. Custom per-period runoff schedules are
+        not supported in batch mode.
+
+        Args:
+            n_paths: Number of Monte Carlo paths
+            runoff_noise: Std dev of the per-path runoff scaling factor
+            seed: Optional RNG seed for reproducibility
+
+        Returns:
+            Dict with per-path survival horizons and summary statistics
+        """
+        from src.balance_sheet import (LIAB_KEYS, HQLA_MASK_VEC,
+                                       HQLA_HAIRCUT_VEC, RWA_WEIGHTS_VEC)
+
+        num_periods = self.scenario.num_periods
+
+        # Tile the packed balance-sheet vector into per-path state
+        vec = self.initial_balance_sheet._vec
+        n_assets = len(ASSET_KEYS)
+        n_liabs = len(LIAB_KEYS)
+        assets = np.tile(vec[:n_assets], (n_paths, 1))
+        liab = np.tile(vec[n_assets:n_assets + n_liabs], (n_paths, 1))
+        cet1 = np.full(n_paths, self.initial_balance_sheet.data['equity'].get('cet1', 0.0),
+                       dtype=np.float64)
+
+        # Per-liability runoff rates (zero for non-deposit items), scaled
+        # by each path's noise factor
+        deposit_types = ('retail_stable', 'retail_unstable', 'corporate_deposits',
+                         'wholesale_funding', 'secured_funding')
+        rate_vec = np.array([
+            self.scenario.runoff_rates.get(k, 0) / 100 if k in deposit_types else 0.0
+            for k in LIAB_KEYS
+        ])
+        rng = np.random.default_rng(seed)
+        factors = rng.normal(1.0, runoff_noise, size=(n_paths, 1)).clip(min=0.0)
+        rate_mat = rate_vec[None, :] * factors
+
+        # Shared liquidation plan from __init__, resolved to column ids
+        plan = [(AssetId[asset_type], haircut)
+                for asset_type, haircut in self._liquidation_plan]
+
+        cash_col = AssetId.cash_reserves
+        loans_col = AssetId.performing_loans
+        npl_col = AssetId.npl
+        n_deposits = 3  # retail_stable, retail_unstable, corporate_deposits
+
+        survival = np.full(n_paths, num_periods, dtype=np.int64)
+        alive = np.ones(n_paths, dtype=bool)
+        lcr = np.full(n_paths, 999.9)
+        cet1_ratio = np.zeros(n_paths)
+
+        for period in range(num_periods):
+            # Withdrawals across all paths at once
+            outflow = liab * rate_mat
+            liab -= outflow
+            remaining = outflow.sum(axis=1)
+
+            # Cash first, then the liquidation plan
+            cash_used = np.minimum(remaining, assets[:, cash_col])
+            assets[:, cash_col] -= cash_used
+            remaining = remaining - cash_used
+
+            for col, haircut in plan:
+                factor = 1 - haircut / 100
+                need = np.where(remaining > 0.01,
+                                remaining / factor if factor > 0 else remaining,
+                                0.0)
+                amount = np.minimum(need, assets[:, col])
+                proceeds = amount * factor
+                assets[:, col] -= amount
+                assets[:, cash_col] += proceeds
+                cet1 -= amount - proceeds
+                remaining = remaining - proceeds
+
+            # Credit deterioration on the same cadence as the scalar loop
+            if period % 10 == 0 and period > 0:
+                migration = assets[:, loans_col] * (self.scenario.loan_migration_rate / 100)
+                assets[:, loans_col] -= migration
+                assets[:, npl_col] += migration
+                cet1 -= migration * (self.scenario.provisioning_rate / 100)
+
+            # Breach checks, elementwise across paths
+            hqla_weighted = assets @ HQLA_HAIRCUT_VEC
+            net_outflows = liab[:, :n_deposits].sum(axis=1) * 0.25
+            lcr = np.where(net_outflows > 0, hqla_weighted / net_outflows * 100, 999.9)
+            rwa = assets @ RWA_WEIGHTS_VEC
+            cet1_ratio = np.where(rwa > 0, cet1 / rwa * 100, 0.0)
+            liquid = assets[:, cash_col] + assets @ HQLA_MASK_VEC
+            breach = (lcr < 100) | (cet1_ratio < 4.5) | ((assets[:, cash_col] <= 0) & (liquid <= 0))
+
+            newly_breached = breach & alive
+            survival[newly_breached] = period
+            alive &= ~breach
+            if not alive.any():
+                break
+
+        return {
+            'n_paths': n_paths,
+            'survival_horizon': survival,
+            'breach_rate': float((survival < num_periods).mean()),
+            'survival_mean': float(survival.mean()),
+            'survival_p5': float(np.percentile(survival, 5)),
+            'final_lcr': lcr,
+            'final_cet1': cet1_ratio,
+            'scenario_name': self.scenario.name,
+            'num_periods': num_periods
+        }
+
     def _execute_period(self, balance_sheet, period: int) -> Dict:
         """Execute a single period"""
+        # No full opening/closing snapshots here: copying the whole
+        # balance-sheet dict twice per period dominated memory on long
+        # runs. Periods carry their deltas (outflows, liquidations) plus
+        # a handful of closing scalars; snapshot_at() reconstructs a full
+        # balance sheet on demand.
         period_data = {
             'period': period,
-            'opening_bs': balance_sheet.to_dict(),
             'outflows': {},
             'liquidations': [],
             'losses': 0,
@@ -116,9 +285,52 @@ class LiquidityEngine:
         
         # Step 4: Calculate closing metrics
         period_data['metrics'] = self._calculate_metrics(balance_sheet)
-        period_data['closing_bs'] = balance_sheet.to_dict()
-        
+        period_data['closing_summary'] = {
+            'cash': balance_sheet.data['assets'].get('cash_reserves', 0),
+            'hqla_total': balance_sheet.total_hqla(),
+            'total_assets': balance_sheet.total_assets(),
+            'total_liabilities': balance_sheet.total_liabilities(),
+            'equity': balance_sheet.total_equity()
+        }
+
         return period_data
+
+    def snapshot_at(self, period: int):
+        """
+        Reconstruct the closing balance sheet of a period on demand
+
+        Period results only carry deltas and closing scalars, so a full
+        snapshot is materialized by replaying the recorded outflows,
+        liquidations and credit deterioration (deterministic) on a copy
+        of the initial balance sheet.
+
+        Args:
+            period: 0-indexed period to reconstruct
+
+        Returns:
+            BalanceSheet: Closing state after the given period
+        """
+        if period in self._snapshot_cache:
+            return self._snapshot_cache[period]
+
+        bs = self.initial_balance_sheet.copy()
+        for p in self.period_results[:period + 1]:
+            for deposit_type, amount in p['outflows'].items():
+                bs.apply_withdrawal(deposit_type, amount)
+            for liq in p['liquidations']:
+                if liq['asset_type'] == 'cash_reserves':
+                    # Cash is consumed directly, not sold with proceeds
+                    bs.data['assets']['cash_reserves'] -= liq['amount_liquidated']
+                    bs._rebuild_vec()
+                else:
+                    bs.liquidate_asset(
+                        liq['asset_type'], liq['amount_liquidated'], liq['haircut_pct']
+                    )
+            if p['period'] % 10 == 0 and p['period'] > 0:
+                self.scenario.apply_credit_deterioration(bs)
+        bs.period = period
+        self._snapshot_cache[period] = bs
+        return bs
    
     
     def _apply_withdrawals(self, balance_sheet, period: int, period_data: Dict) -> float:
@@ -140,26 +352,16 @@ class LiquidityEngine:
         
         return total_outflow
     
-   def _meet_outflows(self, balance_sheet, outflow: float, period_data: Dict):
+    def _meet_outflows(self, balance_sheet, outflow: float, period_data: Dict):
         """Meet outflows through asset liquidation"""
         remaining_outflow = outflow
-        
-        # Map liquidation order to asset types
-        asset_mapping = {
-            'Cash': 'cash_reserves',
-            'HQLA Level 1': 'hqla_level1',
-            'HQLA Level 2A': 'hqla_level2a',
-            'HQLA Level 2B': 'hqla_level2b',
-            'Other Securities': 'other_securities',
-            'Performing Loans': 'performing_loans',
-            'Real Estate': 'real_estate'
-        }
-        
+
         # ✅ FIX: Use cash FIRST before liquidating other assets
         cash_available = balance_sheet.data['assets'].get('cash_reserves', 0)
         if cash_available > 0 and remaining_outflow > 0:
             cash_used = min(remaining_outflow, cash_available)
             balance_sheet.data['assets']['cash_reserves'] -= cash_used
+            balance_sheet._rebuild_vec()
             remaining_outflow -= cash_used
             
             period_data['liquidations'].append({
@@ -172,22 +374,16 @@ class LiquidityEngine:
             
             logger.debug(f"Used cash: {cash_used:.2f}M, remaining outflow: {remaining_outflow:.2f}M")
         
-        # Then liquidate other assets if needed
-        for asset_name in self.liquidation_order:
+        # Then liquidate other assets if needed, following the plan
+        # resolved in __init__ (mapping and haircuts pre-applied)
+        for asset_type, haircut in self._liquidation_plan:
             if remaining_outflow <= 0.01:  # Small tolerance for rounding
                 break
-            
-            asset_type = asset_mapping.get(asset_name)
-            if not asset_type or asset_type == 'cash_reserves':  # Skip cash, already used
-                continue
-            
+
             available = balance_sheet.data['assets'].get(asset_type, 0)
             if available <= 0:
                 continue
-            
-            # Calculate haircut
-            haircut = self._get_liquidation_haircut(asset_type, available)
-            
+
             # Calculate how much to liquidate
             # Need: remaining_outflow = amount * (1 - haircut/100)
             # So: amount = remaining_outflow / (1 - haircut/100)
@@ -213,66 +409,46 @@ class LiquidityEngine:
     
     def _get_liquidation_haircut(self, asset_type: str, available: float) -> float:
         """Calculate haircut including fire-sale premium"""
-        base_haircuts = {
-            'cash_reserves': 0,
-            'hqla_level1': 0,
-            'hqla_level2a': 5,
-            'hqla_level2b': 15,
-            'other_securities': 25,
-            'performing_loans': 30,
-            'real_estate': 40
-        }
-        
-        base_haircut = base_haircuts.get(asset_type, 20)
-        
+        asset_id = AssetId[asset_type]
+        base_haircut = HAIRCUT_BY_ID[asset_id]
+
         # Don't apply fire-sale to cash or Level 1 HQLA
-        if asset_type in ['cash_reserves', 'hqla_level1']:
+        if asset_id in _NO_FIRE_SALE_IDS:
             return base_haircut
-        
+
         # Add fire-sale discount for other assets
-        fire_sale = self.scenario.fire_sale_discount
-        
-        return base_haircut + fire_sale
+        return base_haircut + self.scenario.fire_sale_discount
     
     def _calculate_metrics(self, balance_sheet) -> Dict:
         """Calculate liquidity and capital metrics"""
-        return {
-            'lcr': self._calculate_lcr(balance_sheet),
-            'nsfr': self._calculate_nsfr(balance_sheet),
-            'cet1_ratio': balance_sheet.cet1_ratio(),
-            'total_capital_ratio': balance_sheet.total_capital_ratio(),
-            'liquid_assets': balance_sheet.total_liquid_assets(),
-            'total_deposits': balance_sheet.total_deposits()
-        }
-    
-    def _calculate_lcr(self, balance_sheet) -> float:
-        """Calculate Liquidity Coverage Ratio (simplified)"""
-        hqla = balance_sheet.total_hqla(apply_haircuts=True)
-        
-        # 30-day net outflows (simplified)
+        # Each aggregate is read exactly once; LCR and NSFR are inlined
+        # so the former helper methods don't re-scan deposits and equity
+        # that this method already has in hand
+        hqla_weighted = balance_sheet.total_hqla(apply_haircuts=True)
         deposits = balance_sheet.total_deposits()
-        net_outflows = deposits * 0.25  # Simplified assumption
-        
-        if net_outflows <= 0:
-            return 999.9
-        
-        return (hqla / net_outflows) * 100
-    
-    def _calculate_nsfr(self, balance_sheet) -> float:
-        """Calculate Net Stable Funding Ratio (simplified)"""
-        # Available stable funding
         equity = balance_sheet.total_equity()
         retail_stable = balance_sheet.data['liabilities'].get('retail_stable', 0)
-        asf = equity + (retail_stable * 0.95)
-        
-        # Required stable funding
         loans = balance_sheet.data['assets'].get('performing_loans', 0)
+
+        # LCR (simplified): HQLA over 30-day net outflows, assumed 25%
+        # of total deposits
+        net_outflows = deposits * 0.25
+        lcr = (hqla_weighted / net_outflows) * 100 if net_outflows > 0 else 999.9
+
+        # NSFR (simplified): available over required stable funding
         rsf = loans * 0.85
-        
-        if rsf <= 0:
-            return 999.9
-        
-        return (asf / rsf) * 100
+        nsfr = ((equity + retail_stable * 0.95) / rsf) * 100 if rsf > 0 else 999.9
+
+        # One RWA estimate serves both capital ratios
+        cet1_ratio, _, total_capital_ratio = balance_sheet.capital_ratios()
+        return {
+            'lcr': lcr,
+            'nsfr': nsfr,
+            'cet1_ratio': cet1_ratio,
+            'total_capital_ratio': total_capital_ratio,
+            'liquid_assets': balance_sheet.total_liquid_assets(),
+            'total_deposits': deposits
+        }
     
     def _check_breach(self, balance_sheet, period_result: Dict) -> Optional[Dict]:
         """Check for threshold breaches"""
@@ -320,42 +496,48 @@ class LiquidityEngine:
             breach_type = 'None'
         
         # Calculate cumulative metrics
-        total_asset_depletion = sum(
-            sum(liq['amount_liquidated'] for liq in p['liquidations'])
-            for p in self.period_results
-        )
-        
         total_losses = sum(p.get('losses', 0) for p in self.period_results)
         
         # Get final metrics
         final_metrics = self.period_results[-1]['metrics'] if self.period_results else {}
         
-        # Generate period-by-period data for charts
-        periods_data = []
-        for p in self.period_results:
-            # ✅ FIX: Safely access nested dictionaries
-            closing_assets = p.get('closing_bs', {}).get('assets', {})
-            closing_liabilities = p.get('closing_bs', {}).get('liabilities', {})
-            closing_equity = p.get('closing_bs', {}).get('equity', {})
-            
-            periods_data.append({
-                'period': p['period'] + 1,  # Display as 1-indexed
-                'cash': closing_assets.get('cash_reserves', 0),
-                'hqla_total': (
-                    closing_assets.get('hqla_level1', 0) +
-                    closing_assets.get('hqla_level2a', 0) +
-                    closing_assets.get('hqla_level2b', 0)
-                ),
-                'total_assets': sum(closing_assets.values()) if closing_assets else 0,
-                'total_liabilities': sum(closing_liabilities.values()) if closing_liabilities else 0,
-                'equity': sum(closing_equity.values()) if closing_equity else 0,
-                'lcr': p['metrics'].get('lcr', 0),
-                'nsfr': p['metrics'].get('nsfr', 0),
-                'cet1_ratio': p['metrics'].get('cet1_ratio', 0),
-                'liquidity_buffer': p['metrics'].get('liquid_assets', 0),
-                'deposit_runoff': sum(p['outflows'].values()),
-                'asset_sales': sum(liq['amount_liquidated'] for liq in p['liquidations'])
-            })
+        # Generate period-by-period data for charts, laid out as a dict of
+        # column arrays (SoA). The app's DataFrame/CSV/Excel consumers all
+        # accept it directly, without an extra rows-to-columns conversion.
+        n = len(self.period_results)
+        periods_data = {
+            'period': np.empty(n, dtype=np.int64),
+            'cash': np.empty(n),
+            'hqla_total': np.empty(n),
+            'total_assets': np.empty(n),
+            'total_liabilities': np.empty(n),
+            'equity': np.empty(n),
+            'lcr': np.empty(n),
+            'nsfr': np.empty(n),
+            'cet1_ratio': np.empty(n),
+            'liquidity_buffer': np.empty(n),
+            'deposit_runoff': np.empty(n),
+            'asset_sales': np.empty(n)
+        }
+        for i, p in enumerate(self.period_results):
+            closing = p.get('closing_summary', {})
+
+            periods_data['period'][i] = p['period'] + 1  # Display as 1-indexed
+            periods_data['cash'][i] = closing.get('cash', 0)
+            periods_data['hqla_total'][i] = closing.get('hqla_total', 0)
+            periods_data['total_assets'][i] = closing.get('total_assets', 0)
+            periods_data['total_liabilities'][i] = closing.get('total_liabilities', 0)
+            periods_data['equity'][i] = closing.get('equity', 0)
+            periods_data['lcr'][i] = p['metrics'].get('lcr', 0)
+            periods_data['nsfr'][i] = p['metrics'].get('nsfr', 0)
+            periods_data['cet1_ratio'][i] = p['metrics'].get('cet1_ratio', 0)
+            periods_data['liquidity_buffer'][i] = p['metrics'].get('liquid_assets', 0)
+            periods_data['deposit_runoff'][i] = sum(p['outflows'].values())
+            periods_data['asset_sales'][i] = sum(liq['amount_liquidated'] for liq in p['liquidations'])
+
+        # Cumulative depletion is a single reduction over the liquidation
+        # column instead of a second nested Python sum over period_results
+        total_asset_depletion = float(periods_data['asset_sales'].sum())
         
         return {
             'survival_horizon': survival_horizon,
@@ -374,3 +556,36 @@ class LiquidityEngine:
             'num_periods': self.scenario.num_periods,
             'simulation_timestamp': datetime.now().isoformat()  # ✅ ADD THIS
         }
+
+
+def run_scenario_job(job) -> tuple:
+    """
+    Run a single scenario in a worker process
+
+    Module-level so it stays picklable for multiprocessing. The job
+    carries plain dicts (not objects) to keep the pickled payload small
+    and spawn-safe.
+
+    Args:
+        job: Tuple of (balance_sheet_data, scenario_dict, liquidation_order)
+
+    Returns:
+        tuple: (scenario_name, simulation results dict)
+    """
+    from src.balance_sheet import BalanceSheet
+    from src.stress_scenarios import StressScenario
+    from src._fast_clone import clone_bs_data
+
+    bs_data, scenario_dict, liquidation_order = job
+
+    balance_sheet = BalanceSheet(clone_bs_data(bs_data))
+    scenario = StressScenario.from_dict(scenario_dict)
+
+    engine = LiquidityEngine(
+        balance_sheet=balance_sheet,
+        scenario=scenario,
+        liquidation_order=list(liquidation_order)
+    )
+    results = engine.run_simulation(progress_callback=None)
+
+    return scenario.name, results
@@ -10,6 +10,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+# orjson serializes log records several times faster than stdlib json;
+# fall back silently when the optional package is absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class AppLogger:
     """
@@ -170,7 +177,9 @@ class StructuredFormatter(logging.Formatter):
         
         if hasattr(record, 'user_id'):
             log_data['user_id'] = record.user_id
-        
+
+        if orjson is not None:
+            return orjson.dumps(log_data).decode()
         return json.dumps(log_data)
 
 
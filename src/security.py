@@ -248,9 +248,9 @@ class SecurityManager:
             data: Sensitive data to hash
             
         Returns:
-            str: SHA256 hash of the data
+            str: BLAKE2b hash of the data
         """
-        return hashlib.sha256(data.encode()).hexdigest()
+        return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
     
     def check_rate_limit(
         self,
@@ -13,10 +13,13 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class StressScenario:
     """
     Represents a stress testing scenario
+
+    slots keeps instances compact and makes field access a fixed-offset
+    load instead of a dict probe in the per-period engine loops.
     """
     
     name: str
@@ -200,7 +203,8 @@ class StressScenario:
         # Apply provisioning
         provision = migration_amount * (self.provisioning_rate / 100)
         balance_sheet.data['equity']['cet1'] -= provision
-        
+        balance_sheet._rebuild_vec()
+
         logger.debug(
             f"Credit deterioration: Migrated {migration_amount:.2f}M to NPL, "
             f"Provision {provision:.2f}M"
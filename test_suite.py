@@ -72,7 +72,7 @@ def test_balance_sheet():
                 'corporate_deposits': 3000.0,
                 'wholesale_funding': 2000.0,
                 'secured_funding': 1500.0,
-                'other_liabilities': 500.0
+                'other_liabilities': 800.0
             },
             'equity': {
                 'cet1': 1500.0,
@@ -80,9 +80,9 @@ def test_balance_sheet():
                 'tier2': 300.0
             }
         }
-        
+
         bs = BalanceSheet(bs_data)
-        
+
         # Validate
         if not bs.validate():
             raise Exception("Balance sheet validation failed")